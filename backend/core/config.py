@@ -77,6 +77,62 @@ RATE_LIMIT_PER_MINUTE = int(os.getenv("RATE_LIMIT_PER_MINUTE", "60"))
 RATE_LIMIT_AUTH_PER_MINUTE = int(os.getenv("RATE_LIMIT_AUTH_PER_MINUTE", "10"))
 RATE_LIMIT_STRICT_PER_MINUTE = int(os.getenv("RATE_LIMIT_STRICT_PER_MINUTE", "5"))
 
+# -----------------------------
+# SIGNALING CONFIGURATION
+# -----------------------------
+SIGNALING_SEND_TIMEOUT_SECONDS = float(os.getenv("SIGNALING_SEND_TIMEOUT_SECONDS", "2.0"))
+SIGNALING_SLOW_BROADCAST_MS = float(os.getenv("SIGNALING_SLOW_BROADCAST_MS", "250"))
+SIGNALING_OUTBOUND_QUEUE_SIZE = int(os.getenv("SIGNALING_OUTBOUND_QUEUE_SIZE", "256"))
+# drop_oldest | coalesce | disconnect
+SIGNALING_OVERFLOW_POLICY = os.getenv("SIGNALING_OVERFLOW_POLICY", "coalesce").strip().lower()
+SIGNALING_DB_THREADS = int(os.getenv("SIGNALING_DB_THREADS", "4"))
+# How long a dropped client can resume its seat, and how many room events are kept for replay.
+SIGNALING_RESUME_GRACE_SECONDS = float(os.getenv("SIGNALING_RESUME_GRACE_SECONDS", "30"))
+SIGNALING_REPLAY_BUFFER_SIZE = int(os.getenv("SIGNALING_REPLAY_BUFFER_SIZE", "512"))
+# Recent chat kept per room for "chat-history" catch-up, capped by message count and by total characters.
+SIGNALING_CHAT_HISTORY_SIZE = int(os.getenv("SIGNALING_CHAT_HISTORY_SIZE", "200"))
+SIGNALING_CHAT_HISTORY_MAX_BYTES = int(os.getenv("SIGNALING_CHAT_HISTORY_MAX_BYTES", "262144"))
+# Shared keep-alive for signaling and STT sockets; clients that answer pings are reaped after the timeout.
+HEARTBEAT_INTERVAL_SECONDS = float(os.getenv("HEARTBEAT_INTERVAL_SECONDS", "20"))
+HEARTBEAT_TIMEOUT_SECONDS = float(os.getenv("HEARTBEAT_TIMEOUT_SECONDS", "60"))
+# Per-connection token buckets for inbound signaling messages (messages/second, burst); rate 0 disables.
+SIGNALING_CHAT_RATE_PER_SECOND = float(os.getenv("SIGNALING_CHAT_RATE_PER_SECOND", "2"))
+SIGNALING_CHAT_BURST = float(os.getenv("SIGNALING_CHAT_BURST", "10"))
+SIGNALING_STATE_RATE_PER_SECOND = float(os.getenv("SIGNALING_STATE_RATE_PER_SECOND", "10"))
+SIGNALING_STATE_BURST = float(os.getenv("SIGNALING_STATE_BURST", "20"))
+SIGNALING_RTC_RATE_PER_SECOND = float(os.getenv("SIGNALING_RTC_RATE_PER_SECOND", "50"))
+SIGNALING_RTC_BURST = float(os.getenv("SIGNALING_RTC_BURST", "200"))
+# Added to the RTC bucket for every other seat in the room: a joiner sends an offer and its ICE candidates to each peer.
+SIGNALING_RTC_RATE_PER_PEER = float(os.getenv("SIGNALING_RTC_RATE_PER_PEER", "5"))
+SIGNALING_RTC_BURST_PER_PEER = float(os.getenv("SIGNALING_RTC_BURST_PER_PEER", "20"))
+# Host-only actions (kick, mute, admit, end meeting) from the room's host are not counted against the control bucket.
+SIGNALING_CONTROL_RATE_PER_SECOND = float(os.getenv("SIGNALING_CONTROL_RATE_PER_SECOND", "5"))
+SIGNALING_CONTROL_BURST = float(os.getenv("SIGNALING_CONTROL_BURST", "20"))
+# Window for batching audio/video state into presence deltas for protocol v2 clients; 0 sends every change at once.
+SIGNALING_PRESENCE_INTERVAL_MS = float(os.getenv("SIGNALING_PRESENCE_INTERVAL_MS", "100"))
+# Webinar attendees get the participant count at most once per window instead of every join/leave.
+SIGNALING_WEBINAR_COUNT_INTERVAL_MS = float(os.getenv("SIGNALING_WEBINAR_COUNT_INTERVAL_MS", "1000"))
+# Periodic snapshots of rooms and guest sessions, restored on startup: off | file | redis (uses REDIS_URL).
+# Off unless a path is configured; the file is written owner-only (0600).
+SIGNALING_SNAPSHOT_PATH = os.getenv("SIGNALING_SNAPSHOT_PATH", "").strip()
+SIGNALING_SNAPSHOT_BACKEND = os.getenv(
+    "SIGNALING_SNAPSHOT_BACKEND",
+    "file" if SIGNALING_SNAPSHOT_PATH else "off",
+).strip().lower()
+SIGNALING_SNAPSHOT_INTERVAL_SECONDS = float(os.getenv("SIGNALING_SNAPSHOT_INTERVAL_SECONDS", "10"))
+# Each worker saves and restores only its own snapshot, keyed by this id; it must stay the same across restarts.
+# Defaults to the hostname, so several workers on one host each need their own value.
+SIGNALING_INSTANCE_ID = os.getenv("SIGNALING_INSTANCE_ID", "").strip()
+# A snapshot older than this at startup is ignored rather than restored.
+SIGNALING_SNAPSHOT_MAX_AGE_SECONDS = float(os.getenv("SIGNALING_SNAPSHOT_MAX_AGE_SECONDS", "300"))
+# Write-behind persistence: rows are inserted in batches of up to N, or after T ms, with at most MAX_PENDING buffered.
+WRITE_BEHIND_BATCH_SIZE = int(os.getenv("WRITE_BEHIND_BATCH_SIZE", "200"))
+WRITE_BEHIND_INTERVAL_MS = float(os.getenv("WRITE_BEHIND_INTERVAL_MS", "1000"))
+WRITE_BEHIND_MAX_PENDING = int(os.getenv("WRITE_BEHIND_MAX_PENDING", "20000"))
+CHAT_LOG_ENABLED = os.getenv("CHAT_LOG_ENABLED", "true").lower() == "true"
+ATTENDANCE_ENABLED = os.getenv("ATTENDANCE_ENABLED", "true").lower() == "true"
+MEETING_EVENTS_ENABLED = os.getenv("MEETING_EVENTS_ENABLED", "true").lower() == "true"
+
 # -----------------------------
 # OTP CONFIGURATION
 # -----------------------------
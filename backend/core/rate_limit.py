@@ -1,3 +1,6 @@
+import time
+from typing import Dict, Optional, Set, Tuple
+
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 from fastapi import Request
@@ -20,3 +23,69 @@ def rate_limit_strict():
 def rate_limit_default():
     """Default rate limit."""
     return limiter.limit(f"{RATE_LIMIT_PER_MINUTE}/minute")
+
+
+class TokenBucket:
+    """Classic token bucket: ``rate`` tokens per second, holding at most ``capacity``."""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def resize(self, rate: float, capacity: float):
+        """Change the limits in place; tokens follow a change in capacity so a bigger burst is usable at once."""
+        capacity = max(1.0, capacity)
+        self.tokens = max(0.0, min(capacity, self.tokens + capacity - self.capacity))
+        self.rate = rate
+        self.capacity = capacity
+
+    def allow(self, cost: float = 1.0) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return True
+        return False
+
+
+class MessageRateLimiter:
+    """In-memory limiter for one WebSocket connection with a bucket per message class.
+
+    ``limits`` maps a class name to ``(rate_per_second, burst)``; classes
+    without a limit, or with a rate of 0, are never throttled. ``allow`` can
+    be passed a limit for a class whose allowance changes over time, such as
+    one that grows with the room.
+    """
+
+    __slots__ = ("_limits", "_buckets", "_throttled")
+
+    def __init__(self, limits: Dict[str, Tuple[float, float]]):
+        self._limits = limits
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._throttled: Set[str] = set()
+
+    def allow(self, message_class: str, limit: Optional[Tuple[float, float]] = None) -> bool:
+        rate, burst = limit or self._limits.get(message_class, (0.0, 0.0))
+        if rate <= 0:
+            return True
+        bucket = self._buckets.get(message_class)
+        if bucket is None:
+            bucket = self._buckets[message_class] = TokenBucket(rate, burst)
+        elif limit is not None and (bucket.rate, bucket.capacity) != (rate, max(1.0, burst)):
+            bucket.resize(rate, burst)
+        if bucket.allow():
+            self._throttled.discard(message_class)
+            return True
+        return False
+
+    def first_rejection(self, message_class: str) -> bool:
+        """True only for the first rejected message of a burst, so the client is told once."""
+        if message_class in self._throttled:
+            return False
+        self._throttled.add(message_class)
+        return True
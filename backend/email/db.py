@@ -6,6 +6,8 @@ from backend.models.user import Base
 from backend.models.meeting import Meeting  # noqa: F401
 from backend.models.participant import Participant  # noqa: F401
 from backend.models.notes import Note  # noqa: F401
+from backend.models.chat_message import ChatMessage  # noqa: F401
+from backend.models.meeting_event import MeetingEvent  # noqa: F401
 from backend.models.password_reset_token import PasswordResetToken  # noqa: F401
 from backend.models.email_verification_token import EmailVerificationToken  # noqa: F401
 from backend.models.auth_session import AuthSession  # noqa: F401
@@ -112,3 +114,24 @@ def init_db():
                     "WHERE is_email_verified = TRUE AND email_verified_at IS NULL"
                 )
             )
+
+    meeting_columns = {col["name"] for col in insp.get_columns("meetings")}
+
+    for column in ("auto_admit_invited", "auto_admit_users", "webinar_mode"):
+        if column not in meeting_columns:
+            with engine.begin() as conn:
+                conn.execute(
+                    text(
+                        "ALTER TABLE meetings "
+                        f"ADD COLUMN {column} BOOLEAN NOT NULL DEFAULT FALSE"
+                    )
+                )
+
+    if "auto_admit_domains" not in meeting_columns:
+        with engine.begin() as conn:
+            conn.execute(
+                text(
+                    "ALTER TABLE meetings "
+                    "ADD COLUMN auto_admit_domains VARCHAR(1000) NULL"
+                )
+            )
@@ -13,10 +13,18 @@ import json
 
 from backend.auth.router import router as auth_router
 from backend.meetings.router import router as meetings_router
+from backend.meetings.ws_signaling import fanout_stats, room_bus
+from backend.services.attendance import attendance_log
+from backend.services.chat_log import chat_log
+from backend.services.meeting_events import event_log
+from backend.services.outbound import lane_stats
+from backend.services.room_snapshot import room_snapshots
+from backend.services.room_state import room_registry
 from backend.scheduler.unified_scheduler import start_all_schedulers, shutdown_all_schedulers, get_scheduler_status
 from backend.email.db import init_db, engine
 from backend.notes.routes import router as notes_router
 from backend.routers import stt as stt_router
+from backend.services.heartbeat import heartbeat_service
 from backend.services.stt_service import SttService
 from backend.core.rate_limit import limiter
 from backend.core.config import CORS_ORIGINS, REDIS_ENABLED, SCHEDULER_ENABLED
@@ -90,6 +98,13 @@ app.add_middleware(
 async def on_startup():
     init_db()
     app.state.stt_service = SttService()
+    await room_bus.start()
+    await room_snapshots.restore()
+    await room_snapshots.start()
+    await heartbeat_service.start()
+    await chat_log.start()
+    await attendance_log.start()
+    await event_log.start()
     if SCHEDULER_ENABLED:
         start_all_schedulers()
     else:
@@ -98,6 +113,12 @@ async def on_startup():
 
 @app.on_event("shutdown")
 async def on_shutdown():
+    await heartbeat_service.stop()
+    await room_snapshots.stop()
+    await room_bus.stop()
+    await chat_log.stop()
+    await attendance_log.stop()
+    await event_log.stop()
     if SCHEDULER_ENABLED:
         shutdown_all_schedulers()
     print("✓ Application shutdown complete")
@@ -121,6 +142,13 @@ async def full_health_check():
         "services": {
             "database": db_status,
             "redis": "enabled" if REDIS_ENABLED else "disabled",
+            "heartbeat": heartbeat_service.stats.as_dict(),
+            "fanout": fanout_stats.as_dict(),
+            "outbound_lanes": lane_stats.as_dict(),
+            "rate_limited": room_registry.throttled_totals(),
+            "chat_log": chat_log.as_dict(),
+            "attendance": attendance_log.as_dict(),
+            "meeting_events": event_log.as_dict(),
             "scheduler": {
                 "enabled": SCHEDULER_ENABLED,
                 "running": scheduler_status.get("running", False),
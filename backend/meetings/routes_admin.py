@@ -8,6 +8,8 @@ from sqlalchemy.orm import Session
 from backend.auth.utils import get_current_user
 from backend.email.db import get_db
 from backend.models.meeting import Meeting
+from backend.services.invite_index import invite_index_cache
+from backend.services.meeting_cache import meeting_cache
 
 router = APIRouter()
 
@@ -46,7 +48,10 @@ def delete_scheduled_meeting(
             content={"error": "Scheduled meeting not found or not authorized"},
         )
 
+    room_id = meeting.room_id
     db.delete(meeting)
     db.commit()
+    meeting_cache.invalidate(room_id)
+    invite_index_cache.invalidate(room_id)
     logging.info("Deleted scheduled meeting %s", meeting_id)
     return {"message": "Scheduled meeting deleted successfully", "id": meeting_id}
@@ -10,6 +10,7 @@ from backend.models.meeting import Meeting
 from backend.models.participant import Participant
 from backend.models.user import User
 from backend.services.meeting_serializer import group_meetings_by_local_date, serialize_meeting
+from backend.services.room_state import room_registry
 from backend.services.time_service import (
     ensure_utc,
     get_utc_now,
@@ -25,6 +26,7 @@ router = APIRouter()
 @router.get("/meetings")
 def get_meetings_by_date(
     date: str,
+    include_live: bool = Query(False),
     db: Session = Depends(get_db),
     current_user=Depends(get_current_user),
 ):
@@ -44,15 +46,20 @@ def get_meetings_by_date(
     )
 
     now = get_utc_now()
+    live_counts = room_registry.live_counts(m.room_id for m in meetings) if include_live else {}
     return {
         "date": date,
-        "meetings": [serialize_meeting(m, now_utc=now, role="owner") for m in meetings],
+        "meetings": [
+            serialize_meeting(m, now_utc=now, role="owner", live=live_counts.get(m.room_id))
+            for m in meetings
+        ],
     }
 
 
 @router.get("/meetings/dashboard")
 def get_dashboard_meetings(
     upcoming_only: bool = Query(False),
+    include_live: bool = Query(False),
     db: Session = Depends(get_db),
     current_user=Depends(get_current_user),
 ):
@@ -92,7 +99,13 @@ def get_dashboard_meetings(
     def _role_resolver(meeting: Meeting) -> str:
         return "owner" if meeting.owner_id == current_user.id else "participant"
 
-    return group_meetings_by_local_date(all_meetings, now_utc=now, role_resolver=_role_resolver)
+    live_counts = room_registry.live_counts(m.room_id for m in all_meetings) if include_live else None
+    return group_meetings_by_local_date(
+        all_meetings,
+        now_utc=now,
+        role_resolver=_role_resolver,
+        live_counts=live_counts,
+    )
 
 
 @router.get("/user/{user_id}")
@@ -1,6 +1,6 @@
 ﻿import logging
 
-from fastapi import APIRouter, Body, Depends
+from fastapi import APIRouter, Body, Depends, Query
 from fastapi.responses import JSONResponse
 from sqlalchemy import func
 from sqlalchemy.orm import Session, joinedload
@@ -8,18 +8,32 @@ from sqlalchemy.orm import Session, joinedload
 from backend.auth.utils import decode_token as decode_jwt_token, get_current_user
 from backend.email.db import get_db
 from backend.models.meeting import Meeting
+from backend.models.meeting_event import MeetingEvent
 from backend.models.participant import Participant
 from backend.models.user import User
 from backend.services.guest_session import guest_session_manager
+from backend.services.invite_index import normalize_email_domains, split_email_domains
+from backend.services.meeting_cache import meeting_cache
+from backend.services.meeting_events import summarize_timeline
 from backend.services.meeting_serializer import serialize_meeting
 from backend.services.permission_service import check_permission, resolve_role_for_user
+from backend.services.room_state import room_registry
 from backend.services.time_service import get_utc_now
 
 router = APIRouter()
 
+MAX_TIMELINE_EVENTS = 1000
+MAX_LIVE_ROOM_IDS = 200
+
+
+def parse_room_ids(values: list[str]) -> list[str]:
+    """Accept repeated and/or comma-separated room ids; dedupe, keep order, cap the batch."""
+    room_ids = (room_id.strip() for value in values for room_id in value.split(","))
+    return list(dict.fromkeys(room_id for room_id in room_ids if room_id))[:MAX_LIVE_ROOM_IDS]
+
 
 @router.get("/meeting/{room_id}")
-def get_meeting_info(room_id: str, db: Session = Depends(get_db)):
+def get_meeting_info(room_id: str, include_live: bool = Query(False), db: Session = Depends(get_db)):
     meeting = (
         db.query(Meeting)
         .options(joinedload(Meeting.owner))
@@ -31,8 +45,9 @@ def get_meeting_info(room_id: str, db: Session = Depends(get_db)):
 
     host_user = meeting.owner
 
+    live = room_registry.live_counts([room_id])[room_id] if include_live else None
     return {
-        "meeting": serialize_meeting(meeting, now_utc=get_utc_now(), role="owner"),
+        "meeting": serialize_meeting(meeting, now_utc=get_utc_now(), role="owner", live=live),
         "id": meeting.id,
         "title": meeting.title,
         "agenda": meeting.agenda,
@@ -53,10 +68,17 @@ def get_meeting_info(room_id: str, db: Session = Depends(get_db)):
             "allow_user_captions": bool(meeting.allow_user_captions),
             "allow_guest_screen_share": bool(meeting.allow_guest_screen_share),
             "allow_user_screen_share": bool(meeting.allow_user_screen_share),
+            "webinar_mode": bool(meeting.webinar_mode),
         },
     }
 
 
+@router.get("/meetings/live")
+async def get_live_counts(room_ids: list[str] = Query(...)):
+    # Read straight from this worker's signaling state on the event loop: no DB, no thread hop.
+    return {"rooms": room_registry.live_counts(parse_room_ids(room_ids))}
+
+
 @router.post("/guest/session")
 def create_guest_session(
     room_id: str = Body(...),
@@ -135,6 +157,10 @@ def update_meeting_permissions(
     allow_user_captions: bool | None = Body(None),
     allow_guest_screen_share: bool | None = Body(None),
     allow_user_screen_share: bool | None = Body(None),
+    webinar_mode: bool | None = Body(None),
+    auto_admit_invited: bool | None = Body(None),
+    auto_admit_users: bool | None = Body(None),
+    auto_admit_domains: list[str] | None = Body(None),
     db: Session = Depends(get_db),
     current_user=Depends(get_current_user),
 ):
@@ -152,9 +178,18 @@ def update_meeting_permissions(
         meeting.allow_guest_screen_share = bool(allow_guest_screen_share)
     if allow_user_screen_share is not None:
         meeting.allow_user_screen_share = bool(allow_user_screen_share)
+    if webinar_mode is not None:
+        meeting.webinar_mode = bool(webinar_mode)
+    if auto_admit_invited is not None:
+        meeting.auto_admit_invited = bool(auto_admit_invited)
+    if auto_admit_users is not None:
+        meeting.auto_admit_users = bool(auto_admit_users)
+    if auto_admit_domains is not None:
+        meeting.auto_admit_domains = ",".join(normalize_email_domains(auto_admit_domains)) or None
 
     db.commit()
     db.refresh(meeting)
+    meeting_cache.refresh(meeting)
     return {
         "message": "Permissions updated",
         "permissions": {
@@ -162,10 +197,57 @@ def update_meeting_permissions(
             "allow_user_captions": meeting.allow_user_captions,
             "allow_guest_screen_share": meeting.allow_guest_screen_share,
             "allow_user_screen_share": meeting.allow_user_screen_share,
+            "webinar_mode": meeting.webinar_mode,
+            "auto_admit_invited": meeting.auto_admit_invited,
+            "auto_admit_users": meeting.auto_admit_users,
+            "auto_admit_domains": list(split_email_domains(meeting.auto_admit_domains)),
         },
     }
 
 
+@router.get("/meeting/{room_id}/analytics")
+def get_meeting_analytics(
+    room_id: str,
+    timeline: bool = False,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    meeting = db.query(Meeting).filter(Meeting.room_id == room_id).first()
+    if not meeting:
+        return JSONResponse(status_code=404, content={"error": "Meeting not found"})
+    if meeting.owner_id != current_user.id:
+        return JSONResponse(status_code=403, content={"error": "Host only action"})
+
+    # Three narrow columns streamed in time order; the aggregation is one pass over them.
+    rows = (
+        db.query(MeetingEvent.event, MeetingEvent.client_id, MeetingEvent.occurred_at)
+        .filter(MeetingEvent.room_id == room_id)
+        .order_by(MeetingEvent.occurred_at, MeetingEvent.id)
+        .yield_per(1000)
+    )
+    result = {"room_id": room_id, **summarize_timeline(rows)}
+
+    if timeline:
+        events = (
+            db.query(MeetingEvent)
+            .filter(MeetingEvent.room_id == room_id)
+            .order_by(MeetingEvent.occurred_at, MeetingEvent.id)
+            .limit(MAX_TIMELINE_EVENTS)
+            .all()
+        )
+        result["timeline"] = [
+            {
+                "event": event.event,
+                "client_id": event.client_id,
+                "actor_client_id": event.actor_client_id,
+                "detail": event.detail,
+                "at": event.occurred_at.isoformat(),
+            }
+            for event in events
+        ]
+    return result
+
+
 @router.post("/meeting/{room_id}/generate-ai-summary")
 def generate_ai_summary(
     room_id: str,
@@ -13,6 +13,7 @@ from backend.models.meeting import Meeting
 from backend.models.participant import Participant
 from backend.models.user import User
 from backend.scheduler.unified_scheduler import schedule_meeting_reminder
+from backend.services.invite_index import invite_index_cache
 from backend.services.meeting_serializer import serialize_meeting
 from backend.services.time_service import get_utc_now, normalize_meeting_window, parse_datetime_to_utc
 
@@ -268,7 +269,7 @@ def invite_instant_participants(
         return {"msg": "Only host can invite participants.", "participants": []}
 
     existing = {
-        (p.email or "").strip().lower()
+        (p.email or "").strip().lower(): p
         for p in db.query(Participant).filter(Participant.meeting_id == meeting.id).all()
     }
 
@@ -277,10 +278,15 @@ def invite_instant_participants(
     for email in invitees:
         if email == host_email:
             continue
-        if email in existing:
+        row = existing.get(email)
+        if row is not None:
+            if row.role == "guest":
+                # Someone who already attended uninvited: the attendance row becomes the invitation.
+                row.role = "participant"
+                to_add.append(email)
             continue
         to_add.append(email)
-        existing.add(email)
+        existing[email] = None
         db.add(
             Participant(
                 meeting_id=meeting.id,
@@ -292,6 +298,8 @@ def invite_instant_participants(
         )
 
     db.commit()
+    # Let a live room auto-admit the new invitees without reloading them.
+    invite_index_cache.add_invitees(room_id, to_add)
 
     if to_add:
         background_tasks.add_task(
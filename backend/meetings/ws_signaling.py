@@ -1,45 +1,1326 @@
 ﻿import asyncio
 import json
 import logging
+import secrets
+import time
 import uuid
-from typing import Dict, List
-
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, Optional
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from sqlalchemy import func
-
 from backend.auth.utils import decode_token as decode_jwt_token
-from backend.email.db import SessionLocal
-from backend.models.meeting import Meeting
-from backend.models.participant import Participant
-from backend.models.user import User
+from backend.core.config import (
+    SIGNALING_CHAT_BURST,
+    SIGNALING_CHAT_RATE_PER_SECOND,
+    SIGNALING_CONTROL_BURST,
+    SIGNALING_CONTROL_RATE_PER_SECOND,
+    SIGNALING_OUTBOUND_QUEUE_SIZE,
+    SIGNALING_OVERFLOW_POLICY,
+    SIGNALING_PRESENCE_INTERVAL_MS,
+    SIGNALING_RESUME_GRACE_SECONDS,
+    SIGNALING_RTC_BURST,
+    SIGNALING_RTC_BURST_PER_PEER,
+    SIGNALING_RTC_RATE_PER_PEER,
+    SIGNALING_RTC_RATE_PER_SECOND,
+    SIGNALING_SEND_TIMEOUT_SECONDS,
+    SIGNALING_SLOW_BROADCAST_MS,
+    SIGNALING_STATE_BURST,
+    SIGNALING_STATE_RATE_PER_SECOND,
+    SIGNALING_WEBINAR_COUNT_INTERVAL_MS,
+)
+from backend.core.rate_limit import MessageRateLimiter
+from backend.services.fanout import FanoutResult, FanoutStats
+from backend.services.attendance import record_joined, record_left
+from backend.services.chat_log import log_chat_message
 from backend.services.guest_session import guest_session_manager
-from backend.services.permission_service import check_permission, resolve_role_for_user
+from backend.services.heartbeat import HeartbeatEntry, heartbeat_service
+from backend.services.invite_index import invite_index_cache
+from backend.services.join_resolver import load_meeting_snapshot, resolve_join_async
+from backend.services.meeting_cache import meeting_cache
+from backend.services.meeting_events import (
+    EVENT_ADMIT,
+    EVENT_DENY,
+    EVENT_HOST_TRANSFER,
+    EVENT_JOIN,
+    EVENT_LEAVE,
+    EVENT_MUTE,
+    EVENT_SCREEN_SHARE,
+    EVENT_WAITING,
+    EVENT_WAITING_LEFT,
+    log_event,
+)
+from backend.services.outbound import (
+    LANE_CHAT,
+    LANE_CONTROL,
+    OutboundConnection,
+    coalesce_key_for,
+    encode_payload,
+    lane_for,
+)
+from backend.services.permission_service import HOST_ONLY_ACTIONS, check_permission
+from backend.services.presence import PresenceAggregator
+from backend.services.room_bus import InProcessRoomBus
+from backend.services.room_snapshot import room_snapshots
+from backend.services.room_state import (
+    AUDIENCE_ALL,
+    AUDIENCE_LEGACY,
+    AUDIENCE_ROSTER,
+    MAIN_GROUP,
+    SCOPE_ATTENDEES,
+    SCOPE_PRESENTERS,
+    ParticipantState,
+    RoomState,
+    group_scope,
+    room_registry,
+    scoped,
+)
 
 router = APIRouter()
 
-rooms: Dict[str, Dict[str, WebSocket]] = {}
-room_hosts: Dict[str, str] = {}
-waiting_rooms: Dict[str, List[Dict]] = {}
-participant_names: Dict[str, Dict[str, str]] = {}
-client_roles: Dict[str, Dict[str, str]] = {}
-participant_states: Dict[str, Dict[str, dict]] = {}
+# Close codes a client sends when it leaves on purpose; anything else keeps its seat for a resume.
+INTENTIONAL_CLOSE_CODES = {1000, 1001, 1005}
+
+fanout_stats = FanoutStats()
+
+MAX_BREAKOUT_GROUPS = 50
+CHAT_HISTORY_PAGE_SIZE = 50
+
+PING_FRAME = encode_payload({"type": "ping"})
+
+# Token bucket limits per message class; each handler names its class when it registers.
+MESSAGE_RATE_LIMITS = {
+    "chat": (SIGNALING_CHAT_RATE_PER_SECOND, SIGNALING_CHAT_BURST),
+    "state": (SIGNALING_STATE_RATE_PER_SECOND, SIGNALING_STATE_BURST),
+    "rtc": (SIGNALING_RTC_RATE_PER_SECOND, SIGNALING_RTC_BURST),
+    "control": (SIGNALING_CONTROL_RATE_PER_SECOND, SIGNALING_CONTROL_BURST),
+}
+
+
+def open_connection(ws: WebSocket) -> OutboundConnection:
+    return OutboundConnection(
+        ws,
+        max_size=SIGNALING_OUTBOUND_QUEUE_SIZE,
+        policy=SIGNALING_OVERFLOW_POLICY,
+        send_timeout=SIGNALING_SEND_TIMEOUT_SECONDS,
+    )
 
 
-async def safe_send(ws: WebSocket, payload: dict):
+async def safe_send(conn: OutboundConnection, payload: dict):
     try:
-        await ws.send_text(json.dumps(payload))
+        conn.send(payload)
     except Exception as exc:
         logging.warning("safe_send failed: %s", exc)
 
 
-async def send_permission_error(ws: WebSocket, action: str, reason: str):
-    await safe_send(ws, {"type": "error", "action": action, "message": reason or "Permission denied"})
+async def send_to_many(conns, payload: dict):
+    text = encode_payload(payload)
+    coalesce_key = coalesce_key_for(payload)
+    lane = lane_for(payload)
+    for conn in conns:
+        conn.send_text(text, coalesce_key, lane)
+
+
+async def send_permission_error(conn: OutboundConnection, action: str, reason: str):
+    await safe_send(conn, {"type": "error", "action": action, "message": reason or "Permission denied"})
+
+
+def _deliver_room(
+    room_id: str,
+    text: str,
+    coalesce_key,
+    exclude_id: str,
+    audience: str = AUDIENCE_ALL,
+    lane: int = LANE_CONTROL,
+):
+    room = room_registry.get(room_id)
+    if room is None:
+        return
+    # Only control frames take the room seq: a socket sends them ahead of the other lanes, so a
+    # client holding seq N has every control frame before it. Chat catches up through chat-history,
+    # and presence is resent as current state on resume.
+    if lane == LANE_CONTROL:
+        # Sequenced even with no live recipients so suspended clients can replay it.
+        text = room.record_event(text, exclude_id, audience)
+    elif lane == LANE_CHAT:
+        text = room.chat.append(text, audience)
+    targets = [
+        (cid, p.conn)
+        for cid, p in room.audience_seats(audience).items()
+        if cid != exclude_id and p.conn is not None and p.receives(audience)
+    ]
+    if not targets:
+        return
+    started = time.perf_counter()
+    result = FanoutResult(recipients=len(targets))
+    for cid, conn in targets:
+        # Only enqueues; each connection's writer task owns the actual network send.
+        if not conn.send_text(text, coalesce_key, lane):
+            result.failed.append(cid)
+    result.enqueue_ms = (time.perf_counter() - started) * 1000
+    fanout_stats.record(result)
+
+    if result.enqueue_ms >= SIGNALING_SLOW_BROADCAST_MS or result.failed:
+        logging.warning(
+            "Slow broadcast in room %s: %d recipients enqueued in %.1f ms, %d dropped",
+            room_id,
+            result.recipients,
+            result.enqueue_ms,
+            len(result.failed),
+        )
+
+
+def _deliver_direct(room_id: str, target_id: str, text: str, lane: int = LANE_CONTROL) -> bool:
+    room = room_registry.get(room_id)
+    conn = room.connection(target_id) if room else None
+    if conn is None:
+        return False
+    conn.send_text(text, lane=lane)
+    return True
+
+
+room_bus = InProcessRoomBus()
+room_bus.bind(_deliver_room, _deliver_direct)
+
+
+async def broadcast_to_room(room_id: str, payload: dict, exclude_id: str = "", audience: str = AUDIENCE_ALL):
+    await room_bus.publish_room(
+        room_id,
+        encode_payload(payload),
+        coalesce_key_for(payload),
+        exclude_id,
+        audience,
+        lane_for(payload),
+    )
+
+
+async def _flush_presence(room_id: str, changes: list):
+    room = room_registry.get(room_id)
+    if room is None:
+        return
+    # Seats that left during the window are already covered by user-left.
+    changes = [change for change in changes if change["id"] in room.participants]
+    webinar = _is_webinar(room_id)
+    if not webinar and not room.breakouts:
+        if changes:
+            await broadcast_to_room(room_id, {"type": "presence", "changes": changes}, audience=AUDIENCE_ROSTER)
+        return
+    # One delta per audience: breakout groups, or presenters-only for webinar attendees.
+    by_audience: Dict[str, list] = {}
+    for change in changes:
+        subject = room.participants[change["id"]]
+        by_audience.setdefault(_subject_audience(room, subject, webinar, AUDIENCE_ROSTER), []).append(change)
+    for audience, grouped in by_audience.items():
+        await broadcast_to_room(room_id, {"type": "presence", "changes": grouped}, audience=audience)
+
+
+presence = PresenceAggregator(SIGNALING_PRESENCE_INTERVAL_MS / 1000)
+presence.bind(_flush_presence)
+
+
+def _is_webinar(room_id: str) -> bool:
+    meeting = meeting_cache.get(room_id)
+    return bool(meeting and meeting.webinar_mode)
+
+
+def _group_audience(room: RoomState, member: Optional[ParticipantState], audience: str = AUDIENCE_ALL) -> str:
+    """While breakouts are open, room traffic from a member stays inside the member's group."""
+    if room.breakouts and member is not None:
+        return scoped(group_scope(member.group), audience)
+    return audience
+
+
+def _subject_audience(
+    room: RoomState,
+    subject: Optional[ParticipantState],
+    webinar: bool,
+    audience: str = AUDIENCE_ALL,
+) -> str:
+    """Who hears about ``subject``: its breakout group, or in webinar mode only presenters for attendees."""
+    if room.breakouts and subject is not None:
+        return scoped(group_scope(subject.group), audience)
+    if webinar and not subject.presenting:
+        return scoped(SCOPE_PRESENTERS, audience)
+    return audience
+
+
+# room_id -> pending participant-count timer for webinar attendees
+_count_timers: Dict[str, asyncio.TimerHandle] = {}
+
+
+def _schedule_participant_count(room_id: str):
+    if room_id in _count_timers:
+        return
+    _count_timers[room_id] = asyncio.get_running_loop().call_later(
+        SIGNALING_WEBINAR_COUNT_INTERVAL_MS / 1000,
+        lambda: asyncio.create_task(_send_participant_count(room_id)),
+    )
+
+
+async def _send_participant_count(room_id: str):
+    _count_timers.pop(room_id, None)
+    room = room_registry.get(room_id)
+    if room is not None and room.participants:
+        # Presenters track the full roster themselves.
+        await broadcast_to_room(room_id, room.count_payload(), audience=scoped(SCOPE_ATTENDEES))
+
+
+async def relay_to_client(room_id: str, target_id: str, payload: dict):
+    # Goes through the bus like broadcasts, which finds the recipient's socket.
+    await room_bus.publish_direct(room_id, target_id, encode_payload(payload), lane_for(payload))
+
+
+async def _close_room_if_empty(room_id: str):
+    if room_registry.discard_if_empty(room_id):
+        meeting_cache.invalidate(room_id)
+        invite_index_cache.invalidate(room_id)
+        presence.discard(room_id)
+        timer = _count_timers.pop(room_id, None)
+        if timer is not None:
+            timer.cancel()
+        await room_bus.unwatch(room_id)
+
+
+async def _notify_host_waiting(room: RoomState, added=(), removed=(), reason: str | None = None):
+    """Tell the host how the waiting room changed: one delta frame for v2 hosts, per-user frames otherwise."""
+    host = room.get(room.host_id) if room.host_id else None
+    if host is None or host.conn is None:
+        return
+    if host.wants_roster:
+        delta = {
+            "type": "waiting-list-delta",
+            "added": [entry.waiting_payload() for entry in added],
+            "removed": list(removed),
+            "count": len(room.waiting),
+        }
+        if reason:
+            delta["reason"] = reason
+        await safe_send(host.conn, delta)
+        return
+    for entry in added:
+        await safe_send(host.conn, {"type": "waiting-user", **entry.waiting_payload()})
+    for client_id in removed:
+        left_payload = {"type": "waiting-user-left", "client_id": client_id}
+        if reason:
+            left_payload["reason"] = reason
+        await safe_send(host.conn, left_payload)
+    await safe_send(host.conn, {"type": "waiting-room-updated", "count": len(room.waiting)})
+
+
+def _visible_seats(room: RoomState, participant: ParticipantState):
+    """Seats ``participant`` can see, and whether it is a webinar attendee limited to presenters."""
+    if room.breakouts:
+        return room.groups[participant.group], False
+    presenters_only = not participant.presenting and _is_webinar(room.room_id)
+    return (room.presenters if presenters_only else room.participants), presenters_only
+
+
+async def _send_existing_peers(room: RoomState, participant: ParticipantState):
+    # Breakout members only see their group; webinar attendees only presenters, plus how many others there are.
+    seats, presenters_only = _visible_seats(room, participant)
+    # Protocol v2 clients get one roster frame instead of a user-joined per peer.
+    if participant.wants_roster:
+        await safe_send(participant.conn, room.roster_payload(exclude_id=participant.client_id, seats=seats))
+    else:
+        for other in [p for cid, p in seats.items() if cid != participant.client_id]:
+            await safe_send(participant.conn, other.peer_payload())
+    if presenters_only:
+        await safe_send(participant.conn, room.count_payload())
+
+
+async def _send_presence_state(room: RoomState, participant: ParticipantState):
+    """Current media state of every visible peer, for a resumed client: presence frames are not replayed."""
+    seats, presenters_only = _visible_seats(room, participant)
+    others = [p for cid, p in seats.items() if cid != participant.client_id]
+    if participant.wants_roster:
+        if others:
+            changes = [{"id": other.client_id, **other.presence_fields()} for other in others]
+            await safe_send(participant.conn, {"type": "presence", "changes": changes})
+    else:
+        for other in others:
+            payload = {"type": "update-state", "from": other.client_id, **other.presence_fields()}
+            await safe_send(participant.conn, payload)
+    if presenters_only:
+        await safe_send(participant.conn, room.count_payload())
+
+
+async def _send_breakouts(room: RoomState):
+    """The host always sees every group, whichever one it is sitting in."""
+    host = room.host_connection()
+    if host is not None:
+        await safe_send(host, room.breakouts_payload())
+
+
+async def _close_connections(conns, payload: dict):
+    await send_to_many(conns, payload)
+    await asyncio.gather(*(conn.close() for conn in conns), return_exceptions=True)
+
+
+def _seated(room_id: str, participant: ParticipantState):
+    record_joined(room_id, participant)
+    log_event(room_id, EVENT_JOIN, participant.client_id)
+
+
+def _unseated(
+    room_id: str,
+    participant: ParticipantState,
+    left_at: Optional[datetime] = None,
+    reason: Optional[str] = None,
+    actor_id: Optional[str] = None,
+):
+    record_left(room_id, participant, left_at)
+    log_event(room_id, EVENT_LEAVE, participant.client_id, actor_id=actor_id, detail=reason, at=left_at)
+
+
+async def _close_waiting_room(room: RoomState, message: str):
+    for client_id in room.waiting:
+        log_event(room.room_id, EVENT_WAITING_LEFT, client_id, detail="closed")
+    waiting_conns = [entry.conn for entry in room.waiting.values()]
+    room.waiting.clear()
+    await _close_connections(waiting_conns, {"type": "host-left", "message": message})
+
+
+async def _send_waiting_list(room: RoomState, conn: OutboundConnection):
+    await safe_send(
+        conn,
+        {
+            "type": "waiting-list",
+            "users": [entry.waiting_payload() for entry in room.waiting.values()],
+            "count": len(room.waiting),
+        },
+    )
+
+
+async def _finalize_departure(
+    room: RoomState,
+    client_id: str,
+    left_at: Optional[datetime] = None,
+    reason: Optional[str] = None,
+):
+    room_id = room.room_id
+    webinar = _is_webinar(room_id)
+    departed = room.remove(client_id)
+    if departed:
+        _unseated(room_id, departed, left_at, reason)
+
+    if room.participants:
+        audience = _subject_audience(room, departed, webinar) if departed else AUDIENCE_ALL
+        await broadcast_to_room(room_id, {"type": "user-left", "id": client_id}, audience=audience)
+        if webinar and departed and not departed.presenting:
+            _schedule_participant_count(room_id)
+        if room.breakouts:
+            await _send_breakouts(room)
+
+    if room.host_id != client_id:
+        return
+    room.host_id = None
+
+    if room.host_leave_mode == "leave_only":
+        await _close_waiting_room(room, "Host left. Join requests are closed for now.")
+
+        if room.participants:
+            # Prefer someone who is connected right now over a suspended seat.
+            promoted = next(
+                (p for p in room.participants.values() if p.conn is not None),
+                next(iter(room.participants.values())),
+            )
+            was_presenting = promoted.presenting
+            promoted.role = "host"
+            room.refresh_presenter(promoted)
+            room.host_id = promoted.client_id
+            room.host_leave_mode = "end_all"
+            log_event(room_id, EVENT_HOST_TRANSFER, promoted.client_id, actor_id=client_id)
+            if webinar and not was_presenting:
+                # Attendees never saw the new host; they have to before the transfer means anything.
+                await broadcast_to_room(
+                    room_id,
+                    promoted.peer_payload(),
+                    exclude_id=promoted.client_id,
+                    audience=scoped(SCOPE_ATTENDEES),
+                )
+
+            if promoted.conn is not None:
+                await safe_send(
+                    promoted.conn,
+                    {
+                        "type": "host-transferred",
+                        "host_id": promoted.client_id,
+                        "host_name": promoted.name,
+                        "role": "host",
+                        "message": "You are now the host.",
+                    },
+                )
+            await broadcast_to_room(
+                room_id,
+                {
+                    "type": "host-transferred",
+                    "host_id": promoted.client_id,
+                    "host_name": promoted.name,
+                    "message": f"Host left. {promoted.name} is now the host.",
+                },
+                exclude_id=promoted.client_id,
+            )
+            await broadcast_to_room(
+                room_id,
+                {
+                    "type": "host-left-continue",
+                    "message": f"Host left the meeting. {promoted.name} is now host.",
+                },
+            )
+    else:
+        await _close_waiting_room(room, "The host has left. The meeting is now closed.")
+
+        remaining_conns = [other.conn for other in room.participants.values() if other.conn is not None]
+        for other_id in list(room.participants):
+            _unseated(room_id, room.remove(other_id), reason="ended")
+        await _close_connections(remaining_conns, {
+            "type": "host-left",
+            "message": "The host has left. The meeting is now closed.",
+        })
+
+
+async def _expire_suspended(room_id: str, client_id: str):
+    room = room_registry.get(room_id)
+    if room is None or room.suspended.pop(client_id, None) is None:
+        return
+    participant = room.get(client_id)
+    if participant is not None and participant.conn is None:
+        logging.info("Resume window for %s in room %s expired", client_id, room_id)
+        # The client really left when its socket dropped, not when the window ran out.
+        left_at = datetime.now(timezone.utc) - timedelta(seconds=SIGNALING_RESUME_GRACE_SECONDS)
+        await _finalize_departure(room, client_id, left_at, reason="expired")
+    await _close_room_if_empty(room_id)
+
+
+def _suspend_participant(room: RoomState, client_id: str):
+    loop = asyncio.get_running_loop()
+    expiry = loop.call_later(
+        SIGNALING_RESUME_GRACE_SECONDS,
+        lambda: asyncio.create_task(_expire_suspended(room.room_id, client_id)),
+    )
+    room.suspend(client_id, expiry)
+
+
+async def _restore_room(room: RoomState):
+    """Bring a room restored from a snapshot back into service; its seats wait for their clients to resume."""
+    await room_bus.watch(room.room_id)
+    # Audience scoping (webinar mode) reads the cached meeting, which a fresh process does not have yet.
+    await load_meeting_snapshot(room.room_id)
+    if SIGNALING_RESUME_GRACE_SECONDS <= 0:
+        for client_id in list(room.participants):
+            _unseated(room.room_id, room.remove(client_id), reason="restart")
+        await _close_room_if_empty(room.room_id)
+        return
+    for client_id in list(room.participants):
+        _suspend_participant(room, client_id)
+
+
+room_snapshots.bind(_restore_room)
+
+
+class SignalingSession:
+    """Per-socket state shared by the signaling message handlers."""
+
+    __slots__ = (
+        "websocket",
+        "room_id",
+        "connection",
+        "client_ip",
+        "client_id",
+        "user_name",
+        "is_in_waiting",
+        "close_code",
+        "rate_limiter",
+        "heartbeat",
+    )
+
+    def __init__(self, websocket: WebSocket, room_id: str, connection: OutboundConnection, client_ip: str):
+        self.websocket = websocket
+        self.room_id = room_id
+        self.connection = connection
+        self.client_ip = client_ip
+        self.client_id = ""
+        self.user_name = "Guest"
+        self.is_in_waiting = False
+        self.close_code: int | None = None
+        self.rate_limiter = MessageRateLimiter(MESSAGE_RATE_LIMITS)
+        self.heartbeat: HeartbeatEntry | None = None
+
+
+SignalHandlerFunc = Callable[
+    [SignalingSession, Optional[RoomState], Optional[ParticipantState], dict],
+    Awaitable[None],
+]
+
+
+@dataclass(frozen=True)
+class SignalHandler:
+    func: SignalHandlerFunc
+    # Rate-limit bucket; None for frames that are never throttled.
+    message_class: Optional[str] = "control"
+    # Action passed to check_permission before the handler runs.
+    permission: Optional[str] = None
+    # Host-only actions don't depend on meeting settings, so they skip the snapshot lookup.
+    host_only: bool = False
+    # False for handlers that run before the client has a seat (join, resume).
+    needs_seat: bool = True
+
+
+# msg type -> handler; dispatch is a single lookup no matter how many types are registered.
+SIGNAL_HANDLERS: Dict[str, SignalHandler] = {}
+
+
+def signal_handler(
+    *msg_types: str,
+    message_class: Optional[str] = "control",
+    permission: Optional[str] = None,
+    needs_seat: bool = True,
+):
+    def register(func: SignalHandlerFunc) -> SignalHandlerFunc:
+        handler = SignalHandler(
+            func,
+            message_class=message_class,
+            permission=permission,
+            host_only=permission in HOST_ONLY_ACTIONS,
+            needs_seat=needs_seat,
+        )
+        for msg_type in msg_types:
+            SIGNAL_HANDLERS[msg_type] = handler
+        return func
+
+    return register
+
+
+async def _throttle(session: SignalingSession, message_class: str):
+    room = room_registry.get(session.room_id)
+    if room is not None:
+        room.count_throttled(message_class)
+    if session.rate_limiter.first_rejection(message_class):
+        logging.info(
+            "Throttling %s messages from %s in room %s",
+            message_class,
+            session.client_id or session.client_ip,
+            session.room_id,
+        )
+        await safe_send(session.connection, {
+            "type": "error",
+            "action": "rate_limited",
+            "message": f"Too many {message_class} messages; some were dropped.",
+        })
+
+
+async def _permitted(session: SignalingSession, me: Optional[ParticipantState], handler: SignalHandler) -> bool:
+    role = me.role if me else "guest"
+    meeting = None
+    if not handler.host_only:
+        meeting = await load_meeting_snapshot(session.room_id)
+        if not meeting:
+            return False
+    allowed, reason = check_permission(role, handler.permission, meeting)
+    if not allowed:
+        await send_permission_error(session.connection, handler.permission, reason)
+    return allowed
+
+
+def _rtc_limit(room: RoomState):
+    """RTC allowance for one sender, sized so a joiner can negotiate with every peer in the room."""
+    if SIGNALING_RTC_RATE_PER_SECOND <= 0:
+        return None
+    peers = max(0, len(room.participants) - 1)
+    return (
+        SIGNALING_RTC_RATE_PER_SECOND + peers * SIGNALING_RTC_RATE_PER_PEER,
+        SIGNALING_RTC_BURST + peers * SIGNALING_RTC_BURST_PER_PEER,
+    )
+
+
+def _within_rate_limit(
+    session: SignalingSession,
+    room: Optional[RoomState],
+    handler: Optional[SignalHandler],
+    message_class: str,
+) -> bool:
+    if room is not None:
+        if message_class == "rtc":
+            return session.rate_limiter.allow(message_class, _rtc_limit(room))
+        if handler is not None and handler.host_only:
+            me = room.get(session.client_id)
+            if me is not None and me.role == "host":
+                # Moderating a large room takes bursts of kicks, mutes and admits; only the host can send them.
+                return True
+    return session.rate_limiter.allow(message_class)
+
+
+async def dispatch(session: SignalingSession, msg: dict):
+    handler = SIGNAL_HANDLERS.get(msg.get("type", ""))
+    message_class = handler.message_class if handler else "control"
+    room = room_registry.get(session.room_id)
+    if message_class and not _within_rate_limit(session, room, handler, message_class):
+        await _throttle(session, message_class)
+        return
+
+    if handler is not None and not handler.needs_seat:
+        await handler.func(session, None, None, msg)
+        return
+
+    if room is None:
+        return
+
+    if session.is_in_waiting:
+        if session.client_id not in room.participants:
+            await safe_send(session.connection, {
+                "type": "waiting",
+                "message": "You are in the waiting room. Please wait for approval.",
+            })
+            return
+        session.is_in_waiting = False
+
+    if handler is None:
+        return
+    me = room.get(session.client_id)
+    if handler.permission and not await _permitted(session, me, handler):
+        return
+    await handler.func(session, room, me, msg)
+
+
+@signal_handler("pong", message_class=None, needs_seat=False)
+async def _on_pong(session: SignalingSession, room, me, msg: dict):
+    if session.heartbeat is not None:
+        session.heartbeat.pong()
+
+
+@signal_handler("resume", needs_seat=False)
+async def _on_resume(session: SignalingSession, room, me, msg: dict):
+    connection = session.connection
+    resume_session = str(msg.get("session_id") or "")
+    try:
+        last_seq = int(msg.get("last_seq", 0))
+    except (TypeError, ValueError, OverflowError):
+        last_seq = 0
+
+    if room_registry.get(session.room_id) is not None:
+        # Webinar scoping of the replay and roster reads the cached meeting; load it before the lookup.
+        await load_meeting_snapshot(session.room_id)
+    room = room_registry.get(session.room_id)
+    participant = room.by_session(resume_session) if room and resume_session else None
+    if participant is None:
+        await safe_send(connection, {"type": "resume-failed", "message": "Session expired. Please join again."})
+        return
+
+    # The old socket may not have noticed the drop yet; this one takes over the seat.
+    stale_conn = participant.conn
+    room.reattach(participant, connection)
+    if stale_conn is not None and stale_conn is not connection:
+        asyncio.create_task(stale_conn.close(flush=False))
+
+    client_id = session.client_id = participant.client_id
+    session.user_name = participant.name
+    session.is_in_waiting = False
+    events = room.events_since(last_seq, participant)
+    await safe_send(
+        connection,
+        {
+            "type": "resumed",
+            "client_id": client_id,
+            "role": participant.role,
+            "session_id": resume_session,
+            "seq": room.seq,
+            "chat_seq": room.chat.seq,
+            "replayed": events is not None,
+        },
+    )
+    if events is None:
+        await _send_existing_peers(room, participant)
+    else:
+        for text in events:
+            connection.send_text(text)
+        await _send_presence_state(room, participant)
+    if room.host_id == client_id:
+        await _send_waiting_list(room, connection)
+        if room.breakouts:
+            await _send_breakouts(room)
+    logging.info("Client %s resumed in room %s from seq %d", client_id, session.room_id, last_seq)
+
+
+@signal_handler("join", "host-join", "waiting-room-request", needs_seat=False)
+async def _on_join(session: SignalingSession, room, me, msg: dict):
+    connection = session.connection
+    room_id = session.room_id
+    msg_type = msg.get("type")
+    if msg_type == "host-join":
+        msg["is_host"] = True
+    elif msg_type == "waiting-room-request":
+        msg["is_host"] = False
+
+    client_id = msg.get("from", str(uuid.uuid4()))
+    user_name = msg.get("name", "Guest")
+    session.client_id = client_id
+    session.user_name = user_name
+    session_id = msg.get("session_id", "")
+    token = msg.get("token", "")
+    requested_host = bool(msg.get("is_host", False))
+    incoming_audio_enabled = bool(msg.get("audioEnabled", False))
+    incoming_video_enabled = bool(msg.get("videoEnabled", False))
+    try:
+        protocol_version = int(msg.get("protocol", 1))
+    except (TypeError, ValueError, OverflowError):
+        protocol_version = 1
 
+    token_email = None
+    token_user_id = None
+    if token:
+        try:
+            payload = decode_jwt_token(token)
+            token_email = (payload.get("sub") or "").strip().lower() or None
+            token_user_id = payload.get("user_id")
+        except Exception:
+            token_email = None
+
+    guest_session = guest_session_manager.get_session(session_id) if session_id else None
+    join_context = await resolve_join_async(
+        room_id,
+        token_email,
+        token_user_id,
+        requested_host,
+        session_is_host=bool(guest_session and guest_session.is_host),
+    )
+    if not join_context:
+        await safe_send(connection, {"type": "error", "message": "Meeting not found"})
+        return
+    meeting_cache.put(join_context.meeting)
+    role = join_context.role
+
+    previous_client_id = None
+    if guest_session:
+        previous_client_id = guest_session.client_id
+        guest_session_manager.link_client(session_id, client_id)
+        user_name = guest_session.name
+    if join_context.display_name:
+        user_name = join_context.display_name
+    session.user_name = user_name
+    # Guests resume with their guest session; everyone else gets a signaling-only one.
+    resume_session = session_id if guest_session else f"sig_{secrets.token_urlsafe(24)}"
+
+    if room_id not in room_registry:
+        await room_bus.watch(room_id)
+    room = room_registry.get_or_create(room_id)
+
+    # A join carrying the session of a seat kept across a drop or a restart takes it back without re-approval.
+    kept_seat = room.by_session(session_id) if session_id else None
+    readmit = kept_seat is not None and kept_seat.conn is None
+    if readmit:
+        # The seat comes back with the role it was admitted with, not whatever this join's token resolves to.
+        role = kept_seat.role
+
+    # Seats this client takes over under a new id: its guest session's last client, and the kept seat.
+    replaced_ids = {previous_client_id, kept_seat.client_id if readmit else None} - {None, client_id}
+    for replaced_id in replaced_ids:
+        old_active = room.remove(replaced_id)
+        room.remove_waiting(replaced_id)
+        if old_active:
+            _unseated(room_id, old_active, reason="replaced")
+
+        if room.host_id == replaced_id:
+            room.host_id = client_id
+
+        if old_active:
+            await broadcast_to_room(
+                room_id,
+                {"type": "user-left", "id": replaced_id},
+                audience=_subject_audience(room, old_active, _is_webinar(room_id)),
+            )
 
-async def broadcast_to_room(room_id: str, payload: dict, exclude_id: str = ""):
-    for cid, ws in list(rooms.get(room_id, {}).items()):
-        if cid != exclude_id:
-            await safe_send(ws, payload)
+    # A plain join for a seat that is waiting to be resumed starts over instead.
+    stale = room.get(client_id)
+    if stale is not None and stale.conn is None:
+        room.remove(client_id)
+        _unseated(room_id, stale, reason="rejoined")
+        await broadcast_to_room(
+            room_id,
+            {"type": "user-left", "id": client_id},
+            exclude_id=client_id,
+            audience=_subject_audience(room, stale, _is_webinar(room_id)),
+        )
+
+    participant = ParticipantState(
+        client_id,
+        user_name,
+        role,
+        connection,
+        session_id=resume_session,
+        audio_enabled=incoming_audio_enabled,
+        video_enabled=incoming_video_enabled,
+        protocol=protocol_version,
+        email=token_email,
+        user_id=token_user_id or (guest_session.user_id if guest_session else None),
+    )
+    if readmit:
+        participant.presenter = kept_seat.presenter
+
+    if role == "host":
+        participant.avatar_url = msg.get("avatar_url")
+        room.host_id = client_id
+        room.host_leave_mode = "end_all"
+        room.add(participant)
+        _seated(room_id, participant)
+        await safe_send(connection, {"type": "joined", "role": "host", "session_id": resume_session})
+        await _send_existing_peers(room, participant)
+
+        if not participant.wants_roster:
+            for entry in room.waiting.values():
+                await safe_send(
+                    connection,
+                    {
+                        "type": "waiting-user",
+                        "client_id": entry.client_id,
+                        "name": entry.name,
+                    },
+                )
+        await _send_waiting_list(room, connection)
+        if room.breakouts:
+            await _send_breakouts(room)
+
+        await broadcast_to_room(
+            room_id,
+            {
+                "type": "user-joined",
+                "id": client_id,
+                "name": user_name,
+                "role": "host",
+                "is_host": True,
+                "audioEnabled": incoming_audio_enabled,
+                "videoEnabled": incoming_video_enabled,
+            },
+            exclude_id=client_id,
+        )
+    elif join_context.auto_admit or readmit:
+        # Matched an auto-admit policy or already held a seat: seat directly, the host is not asked.
+        if join_context.auto_admit:
+            log_event(room_id, EVENT_ADMIT, client_id, detail="auto")
+        await _seat(room, [participant], auto_admitted=join_context.auto_admit)
+    else:
+        # Everyone else waits for the host's approval.
+        room.enqueue_waiting(participant)
+        session.is_in_waiting = True
+        log_event(room_id, EVENT_WAITING, client_id)
+
+        await _notify_host_waiting(room, added=[participant])
+
+        await safe_send(connection, {
+            "type": "waiting",
+            "message": "You are in the waiting room. Please wait for the host to approve.",
+        })
+
+
+async def _admit(room: RoomState, target_ids, actor_id: Optional[str] = None):
+    """Admit waiting clients in one pass: one host update and one room update however many there are."""
+    admitted = [target for target in map(room.remove_waiting, target_ids) if target is not None]
+    for target in admitted:
+        log_event(room.room_id, EVENT_ADMIT, target.client_id, actor_id=actor_id)
+    await _notify_host_waiting(room, removed=target_ids, reason="approved")
+    if admitted:
+        await _seat(room, admitted)
+
+
+async def _seat(room: RoomState, admitted, auto_admitted: bool = False):
+    room_id = room.room_id
+    webinar = _is_webinar(room_id)
+    # Announce before seating them, so the newcomers only learn about each other from their own roster.
+    if len(admitted) == 1:
+        target = admitted[0]
+        await broadcast_to_room(room_id, target.peer_payload(), audience=_subject_audience(room, target, webinar))
+    else:
+        added: Dict[str, list] = {}
+        for target in admitted:
+            audience = _subject_audience(room, target, webinar, AUDIENCE_ROSTER)
+            added.setdefault(audience, []).append(target.roster_entry())
+        for audience, entries in added.items():
+            await broadcast_to_room(room_id, {"type": "roster-delta", "added": entries}, audience=audience)
+        for target in admitted:
+            await broadcast_to_room(
+                room_id,
+                target.peer_payload(),
+                audience=_subject_audience(room, target, webinar, AUDIENCE_LEGACY),
+            )
+    if webinar and any(not target.presenting for target in admitted):
+        _schedule_participant_count(room_id)
+
+    for target in admitted:
+        room.add(target)
+        _seated(room_id, target)
+        guest_session_manager.approve_guest(room_id, target.client_id)
+    if room.breakouts:
+        await _send_breakouts(room)
+
+    for target in admitted:
+        approved = {
+            "type": "approved",
+            "message": "You have been approved to join the meeting.",
+            "session_id": target.session_id,
+        }
+        if auto_admitted:
+            approved["auto_admitted"] = True
+        await safe_send(target.conn, approved)
+        if not target.wants_roster:
+            # Older clients expect their own user-joined, as they got it from the room broadcast before.
+            await safe_send(target.conn, target.peer_payload())
+        await _send_existing_peers(room, target)
+
+
+@signal_handler("approve", "admit_user", permission="admit_user")
+async def _on_approve(session: SignalingSession, room: RoomState, me, msg: dict):
+    target_id = msg.get("target_client_id")
+    await _admit(room, [target_id] if target_id else [], session.client_id)
+
+
+@signal_handler("admit_all", "admit_many", permission="admit_user")
+async def _on_admit_many(session: SignalingSession, room: RoomState, me, msg: dict):
+    if msg.get("type") == "admit_all":
+        target_ids = list(room.waiting)
+    else:
+        target_ids = [cid for cid in msg.get("target_client_ids") or () if isinstance(cid, str)]
+    await _admit(room, target_ids, session.client_id)
+
+
+@signal_handler("deny", "deny_user", permission="deny_user")
+async def _on_deny(session: SignalingSession, room: RoomState, me, msg: dict):
+    target_id = msg.get("target_client_id")
+    target = room.remove_waiting(target_id) if target_id else None
+    if target:
+        log_event(session.room_id, EVENT_DENY, target_id, actor_id=session.client_id)
+    await _notify_host_waiting(room, removed=[target_id] if target_id else [], reason="denied")
+
+    if target:
+        await safe_send(target.conn, {"type": "denied", "message": "You have been denied entry to the meeting."})
+        try:
+            await target.conn.close()
+        except Exception:
+            pass
+
+
+@signal_handler("remove", "kick_user", permission="kick_user")
+async def _on_kick(session: SignalingSession, room: RoomState, me, msg: dict):
+    target_id = msg.get("target_client_id")
+    target = room.remove(target_id) if target_id else None
+    if target:
+        _unseated(session.room_id, target, reason="kicked", actor_id=session.client_id)
+
+    if target and target.conn is not None:
+        await safe_send(target.conn, {"type": "removed", "message": "You have been removed from the meeting."})
+        try:
+            await target.conn.close()
+        except Exception:
+            pass
+
+    audience = _subject_audience(room, target, _is_webinar(session.room_id)) if target else AUDIENCE_ALL
+    await broadcast_to_room(session.room_id, {"type": "user-left", "id": target_id}, audience=audience)
+
+
+async def _on_host_control(session: SignalingSession, room: RoomState, me, msg: dict):
+    msg_type = msg.get("type")
+    target = room.get(msg.get("target_client_id"))
+    if msg_type in {"mute_user", "disable_camera"}:
+        if target:
+            if msg_type == "mute_user":
+                target.audio_enabled = False
+            if msg_type == "disable_camera":
+                target.video_enabled = False
+            log_event(
+                session.room_id,
+                EVENT_MUTE,
+                target.client_id,
+                actor_id=session.client_id,
+                detail="audio" if msg_type == "mute_user" else "video",
+            )
+    payload = {**msg, "from": session.client_id}
+    if target is None:
+        await broadcast_to_room(session.room_id, payload)
+        return
+    audience = _subject_audience(room, target, _is_webinar(session.room_id))
+    await broadcast_to_room(session.room_id, payload, exclude_id=target.client_id, audience=audience)
+    # The target's own scope may leave it out (a webinar attendee), but it must still get the control.
+    await relay_to_client(session.room_id, target.client_id, payload)
+
+
+for _action in ("mute_user", "disable_camera", "control_screen_share", "start_recording", "stop_recording", "start_meeting", "end_meeting"):
+    signal_handler(_action, permission=_action)(_on_host_control)
+
+
+@signal_handler("offer", "answer", "candidate", message_class="rtc")
+async def _on_rtc(session: SignalingSession, room: RoomState, me, msg: dict):
+    recipient_id = msg.get("to")
+    if recipient_id and room.breakouts:
+        recipient = room.get(recipient_id)
+        if me is None or recipient is None or recipient.group != me.group:
+            # Peers only connect inside their breakout group.
+            return
+    if recipient_id:
+        await relay_to_client(
+            session.room_id,
+            recipient_id,
+            {
+                "type": msg.get("type"),
+                "from": session.client_id,
+                "to": recipient_id,
+                "sdp": msg.get("sdp"),
+                "candidate": msg.get("candidate"),
+            },
+        )
+
+
+def _chat_text(msg: dict):
+    return msg.get("message", msg.get("text"))
+
+
+@signal_handler("chat-message", "private-message", message_class="chat")
+async def _on_chat(session: SignalingSession, room: RoomState, me, msg: dict):
+    target_id = msg.get("to")
+    if target_id:
+        role = me.role if me else "guest"
+        allowed, reason = check_permission(role, "chat_private", await load_meeting_snapshot(session.room_id))
+        if not allowed:
+            await send_permission_error(session.connection, "chat_private", reason)
+            return
+
+        log_chat_message(session.room_id, session.client_id, me, _chat_text(msg), recipient_id=target_id)
+        await relay_to_client(session.room_id, target_id, {**msg, "type": "private-message", "from": session.client_id})
+        return
+
+    log_chat_message(session.room_id, session.client_id, me, _chat_text(msg))
+    await broadcast_to_room(
+        session.room_id,
+        {**msg, "type": "chat-message", "from": session.client_id},
+        exclude_id=session.client_id,
+        audience=_group_audience(room, me),
+    )
+
+
+@signal_handler("chat-history")
+async def _on_chat_history(session: SignalingSession, room: RoomState, me, msg: dict):
+    if me is None:
+        return
+    try:
+        since = max(0, int(msg.get("since", 0)))
+        limit = int(msg.get("limit", CHAT_HISTORY_PAGE_SIZE))
+    except (TypeError, ValueError, OverflowError):
+        since, limit = 0, CHAT_HISTORY_PAGE_SIZE
+    limit = min(max(1, limit), CHAT_HISTORY_PAGE_SIZE)
+    # Only what this seat could have heard live: its own breakout group, never private messages.
+    frames, cursor, more = room.chat.page(since, limit, me.receives)
+    # The stored frames are already encoded; splice them in rather than decoding and re-encoding.
+    session.connection.send_text(
+        '{"type":"chat-history","messages":[%s],"cursor":%d,"more":%s,"truncated":%s}'
+        % (",".join(frames), cursor, json.dumps(more), json.dumps(since < room.chat.evicted_through)),
+        lane=LANE_CHAT,
+    )
+
+
+async def _on_feature(session: SignalingSession, room: RoomState, me, msg: dict):
+    await broadcast_to_room(
+        session.room_id,
+        {**msg, "from": session.client_id},
+        exclude_id=session.client_id,
+        audience=_group_audience(room, me),
+    )
+
+
+signal_handler("generate_ai_summary", permission="generate_ai_summary")(_on_feature)
+signal_handler("toggle_captions", permission="toggle_captions")(_on_feature)
+
+
+@signal_handler("screen-share", "screen_share", "start_screen_share", "screen_share_request", permission="screen_share")
+async def _on_screen_share(session: SignalingSession, room: RoomState, me, msg: dict):
+    detail = msg.get("action") or msg.get("type")
+    log_event(session.room_id, EVENT_SCREEN_SHARE, session.client_id, detail=str(detail))
+    await _on_feature(session, room, me, msg)
+
+
+@signal_handler("audio-toggle", "video-toggle", "update-state", message_class="state")
+async def _on_media_state(session: SignalingSession, room: RoomState, me, msg: dict):
+    msg_type = msg.get("type")
+    changes = {}
+    if me:
+        # The seat is authoritative (late joiners read it from the roster); only real changes go into a delta.
+        before = me.presence_fields()
+        if msg_type == "update-state":
+            me.audio_enabled = bool(msg.get("audioEnabled", False))
+            me.video_enabled = bool(msg.get("videoEnabled", False))
+            me.avatar_url = msg.get("avatar_url")
+        elif msg_type == "audio-toggle":
+            enabled = msg.get("audioEnabled", msg.get("enabled"))
+            if enabled is not None:
+                me.audio_enabled = bool(enabled)
+        else:
+            enabled = msg.get("videoEnabled", msg.get("enabled"))
+            if enabled is not None:
+                me.video_enabled = bool(enabled)
+        after = me.presence_fields()
+        changes = {name: (before[name], after[name]) for name in before if before[name] != after[name]}
+
+    webinar = me is not None and _is_webinar(session.room_id)
+    if not presence.enabled:
+        await broadcast_to_room(
+            session.room_id,
+            {**msg, "from": session.client_id},
+            exclude_id=session.client_id,
+            audience=_subject_audience(room, me, webinar),
+        )
+        return
+    # Roster clients get batched presence deltas instead of every raw toggle.
+    await broadcast_to_room(
+        session.room_id,
+        {**msg, "from": session.client_id},
+        exclude_id=session.client_id,
+        audience=_subject_audience(room, me, webinar, AUDIENCE_LEGACY) if me else AUDIENCE_LEGACY,
+    )
+    presence.record(session.room_id, session.client_id, changes)
+
+
+@signal_handler("set-presenter", permission="manage_presenters")
+async def _on_set_presenter(session: SignalingSession, room: RoomState, me, msg: dict):
+    target = room.get(msg.get("target_client_id"))
+    presenter = bool(msg.get("presenter", True))
+    if target is None or target.role == "host" or target.presenter == presenter:
+        return
+    target.presenter = presenter
+    room.refresh_presenter(target)
+    room_id = session.room_id
+    await broadcast_to_room(room_id, {"type": "presenter-updated", "id": target.client_id, "presenter": presenter})
+    if not _is_webinar(room_id):
+        return
+    # Attendees start or stop seeing this seat; presenters already had it.
+    announcement = target.peer_payload() if presenter else {"type": "user-left", "id": target.client_id}
+    await broadcast_to_room(room_id, announcement, exclude_id=target.client_id, audience=scoped(SCOPE_ATTENDEES))
+    if target.conn is not None and (presenter or target.wants_roster):
+        # A roster frame replaces the client's peer list, so a demoted attendee drops the others too.
+        await _send_existing_peers(room, target)
+    _schedule_participant_count(room_id)
+
+
+async def _move_to_group(room: RoomState, participant: ParticipantState, group_id: str):
+    """Move a seat between breakout groups over its existing socket."""
+    room_id = room.room_id
+    client_id = participant.client_id
+    old_group = participant.group
+    if old_group == group_id:
+        return
+    await broadcast_to_room(
+        room_id,
+        {"type": "user-left", "id": client_id},
+        exclude_id=client_id,
+        audience=scoped(group_scope(old_group)),
+    )
+    if participant.conn is not None and not participant.wants_roster:
+        # Roster clients replace their peer list below; older clients have to be told who went away.
+        for other_id in room.groups[old_group]:
+            if other_id != client_id:
+                await safe_send(participant.conn, {"type": "user-left", "id": other_id})
+    room.move(participant, group_id)
+    await broadcast_to_room(
+        room_id,
+        participant.peer_payload(),
+        exclude_id=client_id,
+        audience=scoped(group_scope(group_id)),
+    )
+    if participant.conn is not None:
+        await safe_send(
+            participant.conn,
+            {"type": "breakout-moved", "group": group_id, "name": room.breakouts.get(group_id, "")},
+        )
+        await _send_existing_peers(room, participant)
+
+
+@signal_handler("breakout-open", permission="manage_breakouts")
+async def _on_breakout_open(session: SignalingSession, room: RoomState, me, msg: dict):
+    remaining = max(0, MAX_BREAKOUT_GROUPS - len(room.breakouts))
+    names = msg.get("groups")
+    if isinstance(names, list):
+        names = [str(name)[:100] for name in names[:remaining]]
+    else:
+        try:
+            count = int(msg.get("count", 0))
+        except (TypeError, ValueError, OverflowError):
+            count = 0
+        # Clamp before building names: the count comes straight from the client.
+        count = max(0, min(count, remaining))
+        offset = len(room.breakouts)
+        names = [f"Group {offset + index + 1}" for index in range(count)]
+    if not names:
+        await send_permission_error(session.connection, "manage_breakouts", "No breakout groups to open")
+        return
+    group_ids = room.open_breakouts(names)
+    if msg.get("auto_assign"):
+        movable = [p for p in room.groups[MAIN_GROUP].values() if p.role != "host"]
+        for index, participant in enumerate(movable):
+            await _move_to_group(room, participant, group_ids[index % len(group_ids)])
+    await _send_breakouts(room)
+
+
+@signal_handler("breakout-move", permission="manage_breakouts")
+async def _on_breakout_move(session: SignalingSession, room: RoomState, me, msg: dict):
+    moves = msg.get("moves")
+    if not isinstance(moves, dict):
+        moves = {msg.get("target_client_id"): msg.get("group", MAIN_GROUP)}
+    for client_id, group_id in moves.items():
+        participant = room.get(client_id)
+        group_id = group_id or MAIN_GROUP
+        if participant is not None and group_id in room.groups:
+            await _move_to_group(room, participant, group_id)
+    await _send_breakouts(room)
+
+
+@signal_handler("breakout-close", permission="manage_breakouts")
+async def _on_breakout_close(session: SignalingSession, room: RoomState, me, msg: dict):
+    if not room.breakouts:
+        return
+    previous = {client_id: p.group for client_id, p in room.participants.items()}
+    room.close_breakouts()
+    for participant in list(room.participants.values()):
+        if participant.conn is None:
+            continue
+        await safe_send(participant.conn, {"type": "breakout-closed"})
+        if participant.wants_roster:
+            await _send_existing_peers(room, participant)
+            continue
+        seats, _ = _visible_seats(room, participant)
+        own_group = previous[participant.client_id]
+        for other_id, other in list(seats.items()):
+            if previous.get(other_id) != own_group:
+                await safe_send(participant.conn, other.peer_payload())
+    await _send_breakouts(room)
+
+
+@signal_handler("host-leave-mode")
+async def _on_host_leave_mode(session: SignalingSession, room: RoomState, me, msg: dict):
+    if room.host_id == session.client_id:
+        requested_mode = str(msg.get("mode", "end_all")).strip().lower()
+        if requested_mode in {"end_all", "leave_only"}:
+            room.host_leave_mode = requested_mode
+
+
+async def _release_session(session: SignalingSession):
+    if session.heartbeat is not None:
+        heartbeat_service.unregister(session.heartbeat)
+    await session.connection.close(flush=False)
+
+    room_id = session.room_id
+    client_id = session.client_id
+    room = room_registry.get(room_id)
+    if room is None:
+        return
+    # An approved client that never sent another frame still has is_in_waiting set; it holds a seat.
+    if session.is_in_waiting and client_id not in room.participants:
+        if room.remove_waiting(client_id):
+            log_event(room_id, EVENT_WAITING_LEFT, client_id)
+            await _notify_host_waiting(room, removed=[client_id])
+    else:
+        # Only clean up if this socket still owns the client id (it may have been replaced on rejoin).
+        current = room.get(client_id)
+        if current is not None and current.conn is session.connection:
+            if session.close_code not in INTENTIONAL_CLOSE_CODES and SIGNALING_RESUME_GRACE_SECONDS > 0:
+                _suspend_participant(room, client_id)
+            else:
+                await _finalize_departure(room, client_id)
+
+    await _close_room_if_empty(room_id)
 
 
 @router.websocket("/ws/{room_id}")
@@ -48,571 +1329,27 @@ async def websocket_endpoint(websocket: WebSocket, room_id: str):
     logging.info("WebSocket connection attempt from %s for room: %s", client_host_ip, room_id)
 
     await websocket.accept()
-    client_id: str = ""
-    user_name: str = "Guest"
-    is_in_waiting: bool = False
-    host_disconnect_mode: str = "end_all"
-
-    async def keep_alive():
-        while True:
-            try:
-                await websocket.send_text(json.dumps({"type": "ping"}))
-                await asyncio.sleep(20)
-            except Exception:
-                break
-
-    ping_task = asyncio.create_task(keep_alive())
+    connection = open_connection(websocket)
+    session = SignalingSession(websocket, room_id, connection, client_host_ip)
+    session.heartbeat = heartbeat_service.register(
+        f"signaling {room_id}/{client_host_ip}",
+        ping=lambda: connection.send_text(PING_FRAME),
+        reap=lambda: connection.close(flush=False),
+    )
 
     try:
         while True:
             raw = await websocket.receive_text()
-            msg = json.loads(raw)
-            msg_type = msg.get("type", "")
-
-            if msg_type == "host-join":
-                msg_type = "join"
-                msg["is_host"] = True
-            elif msg_type == "waiting-room-request":
-                msg_type = "join"
-                msg["is_host"] = False
-
-            if msg_type == "join":
-                client_id = msg.get("from", str(uuid.uuid4()))
-                user_name = msg.get("name", "Guest")
-                session_id = msg.get("session_id", "")
-                token = msg.get("token", "")
-                requested_host = bool(msg.get("is_host", False))
-                incoming_audio_enabled = bool(msg.get("audioEnabled", False))
-                incoming_video_enabled = bool(msg.get("videoEnabled", False))
-
-                db = SessionLocal()
-                try:
-                    meeting = db.query(Meeting).filter(Meeting.room_id == room_id).first()
-                    if not meeting:
-                        await safe_send(websocket, {"type": "error", "message": "Meeting not found"})
-                        continue
-
-                    token_email = None
-                    token_user_id = None
-                    if token:
-                        try:
-                            payload = decode_jwt_token(token)
-                            token_email = (payload.get("sub") or "").strip().lower() or None
-                            token_user_id = payload.get("user_id")
-                        except Exception:
-                            token_email = None
-
-                    session = guest_session_manager.get_session(session_id) if session_id else None
-                    previous_client_id = None
-                    role = "guest"
-
-                    if session:
-                        previous_client_id = session.client_id
-                        guest_session_manager.link_client(session_id, client_id)
-                        user_name = session.name
-                        if session.is_host:
-                            role = "host"
-
-                    if role != "host" and requested_host and token_email and meeting.owner_id:
-                        owner = db.query(User).filter(User.id == meeting.owner_id).first()
-                        if owner and owner.email and owner.email.lower() == token_email:
-                            role = "host"
-                            user_name = owner.name or owner.email or user_name
-
-                    participant_row = None
-                    if role != "host" and token_email:
-                        participant_row = (
-                            db.query(Participant)
-                            .filter(
-                                Participant.meeting_id == meeting.id,
-                                func.lower(Participant.email) == token_email,
-                            )
-                            .first()
-                        )
-
-                    if role != "host":
-                        role = resolve_role_for_user(meeting, participant_row, token_user_id)
-
-                    rooms.setdefault(room_id, {})
-                    waiting_rooms.setdefault(room_id, [])
-                    participant_names.setdefault(room_id, {})
-                    client_roles.setdefault(room_id, {})
-                    participant_states.setdefault(room_id, {})
-
-                    if previous_client_id and previous_client_id != client_id:
-                        old_active_ws = rooms[room_id].pop(previous_client_id, None)
-                        participant_names[room_id].pop(previous_client_id, None)
-                        client_roles[room_id].pop(previous_client_id, None)
-                        participant_states[room_id].pop(previous_client_id, None)
-                        waiting_rooms[room_id] = [
-                            w for w in waiting_rooms.get(room_id, []) if w["client_id"] != previous_client_id
-                        ]
-
-                        if room_hosts.get(room_id) == previous_client_id:
-                            room_hosts[room_id] = client_id
-
-                        if old_active_ws:
-                            await broadcast_to_room(room_id, {"type": "user-left", "id": previous_client_id})
-
-                    if role == "host":
-                        room_hosts[room_id] = client_id
-                        rooms[room_id][client_id] = websocket
-                        participant_names[room_id][client_id] = user_name
-                        client_roles[room_id][client_id] = "host"
-                        participant_states[room_id][client_id] = {
-                            "audioEnabled": incoming_audio_enabled,
-                            "videoEnabled": incoming_video_enabled,
-                            "avatar_url": msg.get("avatar_url"),
-                        }
-                        await safe_send(websocket, {"type": "joined", "role": "host"})
-
-                        for other_id in list(rooms[room_id].keys()):
-                            if other_id != client_id:
-                                other_name = participant_names[room_id].get(other_id, "Participant")
-                                other_role = client_roles.get(room_id, {}).get(other_id, "guest")
-                                other_state = participant_states.get(room_id, {}).get(other_id, {})
-                                await safe_send(
-                                    websocket,
-                                    {
-                                        "type": "user-joined",
-                                        "id": other_id,
-                                        "name": other_name,
-                                        "role": other_role,
-                                        "audioEnabled": bool(other_state.get("audioEnabled", False)),
-                                        "videoEnabled": bool(other_state.get("videoEnabled", False)),
-                                        "avatar_url": other_state.get("avatar_url"),
-                                    },
-                                )
-
-                        for entry in waiting_rooms[room_id]:
-                            await safe_send(
-                                websocket,
-                                {
-                                    "type": "waiting-user",
-                                    "client_id": entry["client_id"],
-                                    "name": entry["name"],
-                                },
-                            )
-                        await safe_send(
-                            websocket,
-                            {
-                                "type": "waiting-list",
-                                "users": [
-                                    {
-                                        "client_id": entry["client_id"],
-                                        "name": entry["name"],
-                                        "role": entry.get("role", "guest"),
-                                    }
-                                    for entry in waiting_rooms[room_id]
-                                ],
-                                "count": len(waiting_rooms[room_id]),
-                            },
-                        )
-
-                        await broadcast_to_room(
-                            room_id,
-                            {
-                                "type": "user-joined",
-                                "id": client_id,
-                                "name": user_name,
-                                "role": "host",
-                                "is_host": True,
-                                "audioEnabled": incoming_audio_enabled,
-                                "videoEnabled": incoming_video_enabled,
-                            },
-                            exclude_id=client_id,
-                        )
-                    else:
-                        # Enforce host approval flow for every non-host join.
-                        waiting_rooms[room_id] = [
-                            w for w in waiting_rooms.get(room_id, []) if w["client_id"] != client_id
-                        ]
-                        waiting_rooms[room_id].append(
-                            {
-                                "client_id": client_id,
-                                "name": user_name,
-                                "session_id": session_id,
-                                "role": role,
-                                "ws": websocket,
-                                "audioEnabled": incoming_audio_enabled,
-                                "videoEnabled": incoming_video_enabled,
-                            }
-                        )
-                        is_in_waiting = True
-
-                        host_id = room_hosts.get(room_id)
-                        if host_id and host_id in rooms.get(room_id, {}):
-                            host_ws = rooms[room_id][host_id]
-                            await safe_send(
-                                host_ws,
-                                {
-                                    "type": "waiting-user",
-                                    "client_id": client_id,
-                                    "name": user_name,
-                                    "role": role,
-                                },
-                            )
-                            await safe_send(
-                                host_ws,
-                                {
-                                    "type": "waiting-room-updated",
-                                    "count": len(waiting_rooms.get(room_id, [])),
-                                },
-                            )
-
-                        await safe_send(websocket, {
-                            "type": "waiting",
-                            "message": "You are in the waiting room. Please wait for the host to approve.",
-                        })
-                finally:
-                    db.close()
-
-                continue
-
-            if is_in_waiting and client_id in rooms.get(room_id, {}):
-                is_in_waiting = False
-
-            if is_in_waiting:
-                await safe_send(websocket, {
-                    "type": "waiting",
-                    "message": "You are in the waiting room. Please wait for approval.",
-                })
-                continue
-
-            role = client_roles.get(room_id, {}).get(client_id, "guest")
-
-            def _host_only(action_name: str) -> bool:
-                db = SessionLocal()
-                try:
-                    meeting = db.query(Meeting).filter(Meeting.room_id == room_id).first()
-                    if not meeting:
-                        return False
-                    allowed, reason = check_permission(role, action_name, meeting)
-                    if not allowed:
-                        asyncio.create_task(send_permission_error(websocket, action_name, reason))
-                    return allowed
-                finally:
-                    db.close()
-
-            if msg_type in {"approve", "admit_user"}:
-                if not _host_only("admit_user"):
-                    continue
-                target_id = msg.get("target_client_id")
-                target_entry = next((w for w in waiting_rooms.get(room_id, []) if w["client_id"] == target_id), None)
-                waiting_rooms[room_id] = [w for w in waiting_rooms.get(room_id, []) if w["client_id"] != target_id]
-                if target_id:
-                    await safe_send(
-                        websocket,
-                        {
-                            "type": "waiting-user-left",
-                            "client_id": target_id,
-                            "reason": "approved",
-                        },
-                    )
-                await safe_send(
-                    websocket,
-                    {
-                        "type": "waiting-room-updated",
-                        "count": len(waiting_rooms.get(room_id, [])),
-                    },
-                )
-
-                if target_entry:
-                    target_ws = target_entry["ws"]
-                    target_name = target_entry["name"]
-                    target_role = target_entry.get("role", "guest")
-                    target_audio_enabled = bool(target_entry.get("audioEnabled", False))
-                    target_video_enabled = bool(target_entry.get("videoEnabled", False))
-                    guest_session_manager.approve_guest(room_id, target_id)
-
-                    rooms[room_id][target_id] = target_ws
-                    participant_names[room_id][target_id] = target_name
-                    client_roles.setdefault(room_id, {})[target_id] = target_role
-                    participant_states.setdefault(room_id, {})[target_id] = {
-                        "audioEnabled": target_audio_enabled,
-                        "videoEnabled": target_video_enabled,
-                    }
-
-                    await safe_send(target_ws, {"type": "approved", "message": "You have been approved to join the meeting."})
-                    await broadcast_to_room(
-                        room_id,
-                        {
-                            "type": "user-joined",
-                            "id": target_id,
-                            "name": target_name,
-                            "role": target_role,
-                            "audioEnabled": target_audio_enabled,
-                            "videoEnabled": target_video_enabled,
-                        },
-                    )
-
-                    for other_id in list(rooms[room_id].keys()):
-                        if other_id != target_id:
-                            other_name = participant_names[room_id].get(other_id, "Participant")
-                            other_role = client_roles.get(room_id, {}).get(other_id, "guest")
-                            other_state = participant_states.get(room_id, {}).get(other_id, {})
-                            await safe_send(
-                                target_ws,
-                                {
-                                    "type": "user-joined",
-                                    "id": other_id,
-                                    "name": other_name,
-                                    "role": other_role,
-                                    "audioEnabled": bool(other_state.get("audioEnabled", False)),
-                                    "videoEnabled": bool(other_state.get("videoEnabled", False)),
-                                    "avatar_url": other_state.get("avatar_url"),
-                                },
-                            )
-                continue
-
-            if msg_type in {"deny", "deny_user"}:
-                if not _host_only("deny_user"):
-                    continue
-                target_id = msg.get("target_client_id")
-                target_entry = next((w for w in waiting_rooms.get(room_id, []) if w["client_id"] == target_id), None)
-                waiting_rooms[room_id] = [w for w in waiting_rooms.get(room_id, []) if w["client_id"] != target_id]
-                if target_id:
-                    await safe_send(
-                        websocket,
-                        {
-                            "type": "waiting-user-left",
-                            "client_id": target_id,
-                            "reason": "denied",
-                        },
-                    )
-                await safe_send(
-                    websocket,
-                    {
-                        "type": "waiting-room-updated",
-                        "count": len(waiting_rooms.get(room_id, [])),
-                    },
-                )
+            session.heartbeat.touch()
+            await dispatch(session, json.loads(raw))
 
-                if target_entry:
-                    await safe_send(target_entry["ws"], {"type": "denied", "message": "You have been denied entry to the meeting."})
-                    try:
-                        await target_entry["ws"].close()
-                    except Exception:
-                        pass
-                continue
-
-            if msg_type in {"remove", "kick_user"}:
-                if not _host_only("kick_user"):
-                    continue
-                target_id = msg.get("target_client_id")
-                target_ws = rooms.get(room_id, {}).pop(target_id, None)
-                participant_names.get(room_id, {}).pop(target_id, None)
-                client_roles.get(room_id, {}).pop(target_id, None)
-                participant_states.get(room_id, {}).pop(target_id, None)
-
-                if target_ws:
-                    await safe_send(target_ws, {"type": "removed", "message": "You have been removed from the meeting."})
-                    try:
-                        await target_ws.close()
-                    except Exception:
-                        pass
-
-                await broadcast_to_room(room_id, {"type": "user-left", "id": target_id})
-                continue
-
-            if msg_type in {"mute_user", "disable_camera", "control_screen_share", "start_recording", "stop_recording", "start_meeting", "end_meeting"}:
-                if not _host_only(msg_type):
-                    continue
-                if msg_type in {"mute_user", "disable_camera"}:
-                    target_id = msg.get("target_client_id")
-                    if target_id:
-                        state_bucket = participant_states.setdefault(room_id, {}).setdefault(target_id, {})
-                        if msg_type == "mute_user":
-                            state_bucket["audioEnabled"] = False
-                        if msg_type == "disable_camera":
-                            state_bucket["videoEnabled"] = False
-                await broadcast_to_room(room_id, {**msg, "from": client_id})
-                continue
-
-            if msg_type in {"offer", "answer", "candidate"}:
-                recipient_id = msg.get("to")
-                if recipient_id:
-                    recipient_ws = rooms.get(room_id, {}).get(recipient_id)
-                    if recipient_ws:
-                        await safe_send(
-                            recipient_ws,
-                            {
-                                "type": msg_type,
-                                "from": client_id,
-                                "to": recipient_id,
-                                "sdp": msg.get("sdp"),
-                                "candidate": msg.get("candidate"),
-                            },
-                        )
-                continue
-
-            if msg_type in {"chat-message", "private-message"}:
-                target_id = msg.get("to")
-                if target_id:
-                    db = SessionLocal()
-                    try:
-                        meeting = db.query(Meeting).filter(Meeting.room_id == room_id).first()
-                        allowed, reason = check_permission(role, "chat_private", meeting)
-                    finally:
-                        db.close()
-                    if not allowed:
-                        await send_permission_error(websocket, "chat_private", reason)
-                        continue
-
-                    recipient_ws = rooms.get(room_id, {}).get(target_id)
-                    if recipient_ws:
-                        await safe_send(recipient_ws, {**msg, "type": "private-message", "from": client_id})
-                    continue
-
-                await broadcast_to_room(room_id, {**msg, "type": "chat-message", "from": client_id}, exclude_id=client_id)
-                continue
-
-            if msg_type in {"generate_ai_summary", "toggle_captions", "screen-share", "screen_share", "start_screen_share", "screen_share_request"}:
-                action = "generate_ai_summary" if msg_type == "generate_ai_summary" else (
-                    "toggle_captions" if msg_type == "toggle_captions" else "screen_share"
-                )
-                db = SessionLocal()
-                try:
-                    meeting = db.query(Meeting).filter(Meeting.room_id == room_id).first()
-                    allowed, reason = check_permission(role, action, meeting)
-                finally:
-                    db.close()
-                if not allowed:
-                    await send_permission_error(websocket, action, reason)
-                    continue
-
-                await broadcast_to_room(room_id, {**msg, "from": client_id}, exclude_id=client_id)
-                continue
-
-            if msg_type in {"audio-toggle", "video-toggle", "update-state"}:
-                if msg_type == "update-state":
-                    participant_states.setdefault(room_id, {})[client_id] = {
-                        "audioEnabled": bool(msg.get("audioEnabled", False)),
-                        "videoEnabled": bool(msg.get("videoEnabled", False)),
-                        "avatar_url": msg.get("avatar_url"),
-                    }
-                await broadcast_to_room(room_id, {**msg, "from": client_id}, exclude_id=client_id)
-                continue
-
-            if msg_type == "host-leave-mode":
-                if room_hosts.get(room_id) == client_id:
-                    requested_mode = str(msg.get("mode", "end_all")).strip().lower()
-                    if requested_mode in {"end_all", "leave_only"}:
-                        host_disconnect_mode = requested_mode
-                continue
-
-    except WebSocketDisconnect:
-        logging.info("Client '%s' (%s) disconnected from room %s", user_name, client_id, room_id)
+    except WebSocketDisconnect as exc:
+        session.close_code = exc.code
+        logging.info("Client '%s' (%s) disconnected from room %s", session.user_name, session.client_id, room_id)
     except Exception as exc:
-        logging.error("WebSocket error for %s in room %s: %s", client_id, room_id, exc, exc_info=True)
+        logging.error("WebSocket error for %s in room %s: %s", session.client_id, room_id, exc, exc_info=True)
     finally:
-        ping_task.cancel()
-
-        if is_in_waiting:
-            waiting_rooms[room_id] = [w for w in waiting_rooms.get(room_id, []) if w["client_id"] != client_id]
-            host_id = room_hosts.get(room_id)
-            if host_id and host_id in rooms.get(room_id, {}):
-                host_ws = rooms[room_id][host_id]
-                await safe_send(host_ws, {"type": "waiting-user-left", "client_id": client_id})
-                await safe_send(
-                    host_ws,
-                    {
-                        "type": "waiting-room-updated",
-                        "count": len(waiting_rooms.get(room_id, [])),
-                    },
-                )
-        else:
-            rooms.get(room_id, {}).pop(client_id, None)
-            participant_names.get(room_id, {}).pop(client_id, None)
-            client_roles.get(room_id, {}).pop(client_id, None)
-            participant_states.get(room_id, {}).pop(client_id, None)
-
-            if rooms.get(room_id):
-                await broadcast_to_room(room_id, {"type": "user-left", "id": client_id})
-
-            if room_hosts.get(room_id) == client_id:
-                del room_hosts[room_id]
-
-                if host_disconnect_mode == "leave_only":
-                    for entry in waiting_rooms.get(room_id, []):
-                        await safe_send(
-                            entry["ws"],
-                            {
-                                "type": "host-left",
-                                "message": "Host left. Join requests are closed for now.",
-                            },
-                        )
-                        try:
-                            await entry["ws"].close()
-                        except Exception:
-                            pass
-                    waiting_rooms[room_id] = []
-
-                    remaining_ids = list(rooms.get(room_id, {}).keys())
-                    if remaining_ids:
-                        new_host_id = remaining_ids[0]
-                        room_hosts[room_id] = new_host_id
-                        client_roles.setdefault(room_id, {})[new_host_id] = "host"
-                        promoted_name = participant_names.get(room_id, {}).get(new_host_id, "Participant")
-
-                        await safe_send(
-                            rooms[room_id][new_host_id],
-                            {
-                                "type": "host-transferred",
-                                "host_id": new_host_id,
-                                "host_name": promoted_name,
-                                "role": "host",
-                                "message": "You are now the host.",
-                            },
-                        )
-                        await broadcast_to_room(
-                            room_id,
-                            {
-                                "type": "host-transferred",
-                                "host_id": new_host_id,
-                                "host_name": promoted_name,
-                                "message": f"Host left. {promoted_name} is now the host.",
-                            },
-                            exclude_id=new_host_id,
-                        )
-                        await broadcast_to_room(
-                            room_id,
-                            {
-                                "type": "host-left-continue",
-                                "message": f"Host left the meeting. {promoted_name} is now host.",
-                            },
-                        )
-                    else:
-                        rooms[room_id] = {}
-                else:
-                    for entry in waiting_rooms.get(room_id, []):
-                        await safe_send(entry["ws"], {
-                            "type": "host-left",
-                            "message": "The host has left. The meeting is now closed.",
-                        })
-                        try:
-                            await entry["ws"].close()
-                        except Exception:
-                            pass
-                    waiting_rooms[room_id] = []
-
-                    for _, ws in list(rooms.get(room_id, {}).items()):
-                        await safe_send(ws, {
-                            "type": "host-left",
-                            "message": "The host has left. The meeting is now closed.",
-                        })
-                        try:
-                            await ws.close()
-                        except Exception:
-                            pass
-                    rooms[room_id] = {}
-
-            if room_id in rooms and not rooms[room_id] and not waiting_rooms.get(room_id):
-                rooms.pop(room_id, None)
-                waiting_rooms.pop(room_id, None)
-                participant_names.pop(room_id, None)
-                client_roles.pop(room_id, None)
-                participant_states.pop(room_id, None)
+        await _release_session(session)
 
 
 @router.websocket("/ws-guest/{room_id}")
@@ -0,0 +1,32 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text
+from sqlalchemy.orm import relationship
+
+from backend.models.user import Base
+
+
+def utc_now():
+    return datetime.now(timezone.utc)
+
+
+class ChatMessage(Base):
+    __tablename__ = "chat_messages"
+
+    id = Column(Integer, primary_key=True, index=True)
+    room_id = Column(String(255), nullable=False)
+    # Null when the meeting was not cached at send time; room_id still identifies it.
+    meeting_id = Column(Integer, ForeignKey("meetings.id", ondelete="CASCADE"), nullable=True, index=True)
+
+    sender_client_id = Column(String(255), nullable=False)
+    sender_name = Column(String(255), nullable=True)
+    sender_role = Column(String(20), nullable=True)  # host|user|participant|guest
+    # Set for private messages only.
+    recipient_client_id = Column(String(255), nullable=True)
+    content = Column(Text, nullable=False)
+    sent_at = Column(DateTime(timezone=True), default=utc_now, nullable=False)
+
+    meeting = relationship("Meeting", back_populates="chat_messages")
+
+
+Index("ix_chat_messages_room_sent", ChatMessage.room_id, ChatMessage.sent_at)
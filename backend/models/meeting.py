@@ -37,6 +37,13 @@ class Meeting(Base):
     allow_user_captions = Column(Boolean, default=False, nullable=False)
     allow_guest_screen_share = Column(Boolean, default=False, nullable=False)
     allow_user_screen_share = Column(Boolean, default=False, nullable=False)
+    # Attendees only see presenters and hosts plus aggregate counts.
+    webinar_mode = Column(Boolean, default=False, nullable=False)
+    # Auto-admit policies: joins that match skip the waiting room.
+    auto_admit_invited = Column(Boolean, default=False, nullable=False)
+    auto_admit_users = Column(Boolean, default=False, nullable=False)
+    # Comma-separated, lowercase email domains, e.g. "example.com,corp.example.com".
+    auto_admit_domains = Column(String(1000), nullable=True)
 
     status = Column(String(20), default="scheduled", nullable=False)
     created_at = Column(DateTime(timezone=True), default=utc_now, nullable=False)
@@ -45,6 +52,12 @@ class Meeting(Base):
     owner = relationship("User", back_populates="owned_meetings")
     participants = relationship("Participant", back_populates="meeting", cascade="all, delete-orphan")
     notes = relationship("Note", back_populates="meeting", cascade="all, delete-orphan")
+    chat_messages = relationship(
+        "ChatMessage", back_populates="meeting", cascade="all, delete-orphan", passive_deletes=True
+    )
+    events = relationship(
+        "MeetingEvent", back_populates="meeting", cascade="all, delete-orphan", passive_deletes=True
+    )
 
 
 Index("ix_meetings_owner_start", Meeting.owner_id, Meeting.scheduled_start)
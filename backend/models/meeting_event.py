@@ -0,0 +1,30 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String
+from sqlalchemy.orm import relationship
+
+from backend.models.user import Base
+
+
+def utc_now():
+    return datetime.now(timezone.utc)
+
+
+class MeetingEvent(Base):
+    __tablename__ = "meeting_events"
+
+    id = Column(Integer, primary_key=True, index=True)
+    room_id = Column(String(255), nullable=False)
+    # Null when the meeting was not cached at the time; room_id still identifies it.
+    meeting_id = Column(Integer, ForeignKey("meetings.id", ondelete="CASCADE"), nullable=True, index=True)
+    event = Column(String(32), nullable=False)  # waiting|waiting-left|admit|deny|join|leave|mute|screen-share|host-transfer
+    client_id = Column(String(255), nullable=False)
+    # Who caused it, for host actions (admit, deny, mute, kick).
+    actor_client_id = Column(String(255), nullable=True)
+    detail = Column(String(64), nullable=True)
+    occurred_at = Column(DateTime(timezone=True), default=utc_now, nullable=False)
+
+    meeting = relationship("Meeting", back_populates="events")
+
+
+Index("ix_meeting_events_room_time", MeetingEvent.room_id, MeetingEvent.occurred_at)
@@ -12,7 +12,8 @@ class Participant(Base):
     user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)
 
     email = Column(String(255), nullable=False, index=True)
-    role = Column(String(20), nullable=False, default="participant")  # host|participant|guest
+    # host|participant|guest; rows created by attendance tracking for people who were never invited are "guest".
+    role = Column(String(20), nullable=False, default="participant")
     status = Column(String(20), nullable=False, default="invited")  # invited|joined|left
     joined_at = Column(DateTime(timezone=True), nullable=True)
     left_at = Column(DateTime(timezone=True), nullable=True)
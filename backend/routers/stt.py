@@ -9,6 +9,7 @@ from fastapi import HTTPException
 from fastapi.websockets import WebSocketState
 from fastapi import Request
 from backend.core.config import JWT_SECRET, SECRET_KEY
+from backend.services.heartbeat import heartbeat_service
 
 router = APIRouter()
 
@@ -64,10 +65,16 @@ async def stt_ws_endpoint(websocket: WebSocket, token: Optional[str] = Query(Non
 
     # register connection (so service can broadcast to room)
     await stt_service.register_connection(room_id, user_id, websocket)
+    heartbeat = heartbeat_service.register(
+        f"stt {room_id}/{user_id}",
+        ping=lambda: websocket.send_text('{"type":"ping"}'),
+        reap=lambda: websocket.close(),
+    )
 
     try:
         while True:
             message = await websocket.receive()
+            heartbeat.touch()
             # message can be {'type':'websocket.receive', 'text':..., 'bytes':...}
             if "bytes" in message and message["bytes"] is not None:
                 # raw PCM16 binary chunk
@@ -83,12 +90,15 @@ async def stt_ws_endpoint(websocket: WebSocket, token: Optional[str] = Query(Non
                 # if client signals stop, close session
                 if data.get("type") == "stop":
                     break
+                if data.get("type") == "pong":
+                    heartbeat.pong()
             else:
                 # ignore ping/pong or other messages
                 await asyncio.sleep(0)
     except WebSocketDisconnect:
         pass
     finally:
+        heartbeat_service.unregister(heartbeat)
         await stt_service.unregister_connection(room_id, user_id, websocket)
         try:
             if websocket.client_state != WebSocketState.DISCONNECTED:
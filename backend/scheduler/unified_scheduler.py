@@ -159,8 +159,11 @@ def schedule_meeting_reminder(meeting_id: int, start_dt, recipients: list | None
 
 def _resolve_meeting_recipients(meeting: Meeting, provided_recipients: list | None = None) -> list[str]:
     owner_email = meeting.owner.email if meeting.owner and meeting.owner.email else None
+    # Guest rows only record attendance; those people were never invited.
     participant_emails = [
-        p.email for p in getattr(meeting, "participants", []) if getattr(p, "email", None)
+        p.email
+        for p in getattr(meeting, "participants", [])
+        if getattr(p, "email", None) and getattr(p, "role", None) != "guest"
     ]
     combined = []
     if owner_email:
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from backend.core.config import (
+    ATTENDANCE_ENABLED,
+    WRITE_BEHIND_BATCH_SIZE,
+    WRITE_BEHIND_INTERVAL_MS,
+    WRITE_BEHIND_MAX_PENDING,
+)
+from backend.email.db import SessionLocal
+from backend.models.meeting import Meeting
+from backend.models.participant import Participant
+from backend.services.room_state import ParticipantState
+from backend.services.write_behind import WriteBehindBatcher
+
+# Seats without an account email are recorded under "<client id>@guest.invalid".
+GUEST_EMAIL_DOMAIN = "guest.invalid"
+# Rows created from attendance alone never grant anything: resolve_role treats "guest" like no row.
+ATTENDANCE_ROLE = "guest"
+
+
+def attendance_email(participant: ParticipantState) -> str:
+    if participant.email:
+        return participant.email
+    return f"{participant.client_id[:200].lower()}@{GUEST_EMAIL_DOMAIN}"
+
+
+def _merge_attendance(pending: dict, event: dict) -> dict:
+    # A leave and a rejoin inside one window collapse into "still joined since the earlier join".
+    merged = {**pending, **event}
+    merged["joined_at"] = pending["joined_at"] or event["joined_at"]
+    merged["user_id"] = event["user_id"] or pending["user_id"]
+    return merged
+
+
+def _apply_attendance(records: List[dict]):
+    db = SessionLocal()
+    try:
+        meeting_ids = dict(
+            db.query(Meeting.room_id, Meeting.id)
+            .filter(Meeting.room_id.in_({record["room_id"] for record in records}))
+            .all()
+        )
+        emails = {record["email"] for record in records}
+        rows: Dict[Tuple[int, str], Participant] = {
+            (row.meeting_id, row.email.lower()): row
+            for row in db.query(Participant)
+            .filter(Participant.meeting_id.in_(set(meeting_ids.values())), Participant.email.in_(emails))
+            .all()
+        }
+        for record in records:
+            meeting_id = meeting_ids.get(record["room_id"])
+            if meeting_id is None:
+                continue
+            key = (meeting_id, record["email"])
+            row = rows.get(key)
+            if row is None:
+                row = Participant(meeting_id=meeting_id, email=record["email"], role=ATTENDANCE_ROLE)
+                db.add(row)
+                rows[key] = row
+            if record["user_id"] and row.user_id is None:
+                row.user_id = record["user_id"]
+            # joined_at/left_at bracket the latest stay; a reconnect inside one window is not a new stay.
+            row.status = record["status"]
+            if record["joined_at"] is not None:
+                row.joined_at = record["joined_at"]
+            elif row.joined_at is None:
+                row.joined_at = record["left_at"]
+            row.left_at = record["left_at"] if record["status"] == "left" else None
+        db.commit()
+    finally:
+        db.close()
+
+
+attendance_log: WriteBehindBatcher[dict] = WriteBehindBatcher(
+    "attendance",
+    _apply_attendance,
+    batch_size=WRITE_BEHIND_BATCH_SIZE,
+    interval=WRITE_BEHIND_INTERVAL_MS / 1000,
+    max_pending=WRITE_BEHIND_MAX_PENDING,
+    merge=_merge_attendance,
+)
+
+
+def _record(room_id: str, participant: ParticipantState, status: str, at: Optional[datetime]):
+    if not ATTENDANCE_ENABLED:
+        return
+    at = at or datetime.now(timezone.utc)
+    email = attendance_email(participant)
+    attendance_log.add(
+        {
+            "room_id": room_id,
+            "email": email,
+            "user_id": participant.user_id,
+            "status": status,
+            "joined_at": at if status == "joined" else None,
+            "left_at": at if status == "left" else None,
+        },
+        key=(room_id, email),
+    )
+
+
+def record_joined(room_id: str, participant: ParticipantState, at: Optional[datetime] = None):
+    _record(room_id, participant, "joined", at)
+
+
+def record_left(room_id: str, participant: ParticipantState, at: Optional[datetime] = None):
+    _record(room_id, participant, "left", at)
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Callable, Deque, List, Tuple
+
+from backend.core.config import SIGNALING_CHAT_HISTORY_MAX_BYTES, SIGNALING_CHAT_HISTORY_SIZE
+
+
+class ChatHistory:
+    """Bounded ring of a room's recent chat frames, capped by message count and by size.
+
+    Chat frames carry their own ``chat_seq`` rather than the room seq: they
+    wait in a lower lane than control frames, so they reach a socket out of
+    room order and resume could not replay them. Frames are kept exactly as
+    they were broadcast, so a catch-up page is a string join rather than a
+    re-encode. The chat seq doubles as the paging cursor.
+    """
+
+    __slots__ = ("max_messages", "max_bytes", "seq", "size", "evicted_through", "_entries")
+
+    def __init__(self, max_messages: int = SIGNALING_CHAT_HISTORY_SIZE, max_bytes: int = SIGNALING_CHAT_HISTORY_MAX_BYTES):
+        self.max_messages = max(0, max_messages)
+        self.max_bytes = max(0, max_bytes)
+        self.seq = 0
+        self.size = 0
+        # Seq of the newest frame pushed out of the ring; a cursor below it has missed messages.
+        self.evicted_through = 0
+        # (seq, stamped frame, audience)
+        self._entries: Deque[Tuple[int, str, str]] = deque()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def append(self, text: str, audience: str) -> str:
+        """Stamp a broadcast chat frame with the next chat seq and keep it; returns the stamped frame."""
+        self.seq += 1
+        # Frames are JSON objects, so the seq can be spliced in without re-encoding.
+        text = f'{{"chat_seq":{self.seq},{text[1:]}' if len(text) > 2 else text
+        if not self.max_messages or len(text) > self.max_bytes:
+            return text
+        self._entries.append((self.seq, text, audience))
+        self.size += len(text)
+        while len(self._entries) > self.max_messages or self.size > self.max_bytes:
+            evicted_seq, evicted, _ = self._entries.popleft()
+            self.size -= len(evicted)
+            self.evicted_through = evicted_seq
+        return text
+
+    def page(self, since: int, limit: int, visible: Callable[[str], bool]) -> Tuple[List[str], int, bool]:
+        """Up to ``limit`` visible frames after seq ``since``, oldest first.
+
+        Returns the frames, the cursor to pass as the next ``since`` and
+        whether more visible frames follow it.
+        """
+        frames: List[str] = []
+        cursor = since
+        for seq, text, audience in self._entries:
+            if seq <= since or not visible(audience):
+                continue
+            if len(frames) >= limit:
+                return frames, cursor, True
+            frames.append(text)
+            cursor = seq
+        return frames, cursor, False
+
+    def clear(self):
+        self._entries.clear()
+        self.size = 0
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from sqlalchemy import insert
+
+from backend.core.config import (
+    CHAT_LOG_ENABLED,
+    WRITE_BEHIND_BATCH_SIZE,
+    WRITE_BEHIND_INTERVAL_MS,
+    WRITE_BEHIND_MAX_PENDING,
+)
+from backend.email.db import SessionLocal
+from backend.models.chat_message import ChatMessage
+from backend.services.meeting_cache import meeting_cache
+from backend.services.room_state import ParticipantState
+from backend.services.write_behind import WriteBehindBatcher
+
+# Longer messages are stored truncated rather than rejected.
+MAX_LOGGED_CHARS = 4000
+# Column lengths for the client-supplied fields; one oversized value would fail the whole batch.
+MAX_ID_CHARS = 255
+MAX_NAME_CHARS = 255
+MAX_ROLE_CHARS = 20
+
+
+def _clip(value, limit: int) -> Optional[str]:
+    return str(value)[:limit] if value is not None else None
+
+
+def _insert_chat_messages(rows: List[dict]):
+    db = SessionLocal()
+    try:
+        db.execute(insert(ChatMessage), rows)
+        db.commit()
+    finally:
+        db.close()
+
+
+chat_log: WriteBehindBatcher[dict] = WriteBehindBatcher(
+    "chat",
+    _insert_chat_messages,
+    batch_size=WRITE_BEHIND_BATCH_SIZE,
+    interval=WRITE_BEHIND_INTERVAL_MS / 1000,
+    max_pending=WRITE_BEHIND_MAX_PENDING,
+)
+
+
+def log_chat_message(
+    room_id: str,
+    sender_id: str,
+    sender: Optional[ParticipantState],
+    content,
+    recipient_id: Optional[str] = None,
+):
+    """Queue one chat message for the durable log; never touches the DB itself."""
+    if not CHAT_LOG_ENABLED or content is None:
+        return
+    meeting = meeting_cache.get(room_id)
+    chat_log.add({
+        "room_id": room_id[:MAX_ID_CHARS],
+        "meeting_id": meeting.id if meeting else None,
+        "sender_client_id": _clip(sender_id, MAX_ID_CHARS) or "",
+        "sender_name": _clip(sender.name, MAX_NAME_CHARS) if sender else None,
+        "sender_role": _clip(sender.role, MAX_ROLE_CHARS) if sender else None,
+        "recipient_client_id": _clip(recipient_id, MAX_ID_CHARS),
+        "content": str(content)[:MAX_LOGGED_CHARS],
+        "sent_at": datetime.now(timezone.utc),
+    })
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import List
+
+
+@dataclass
+class FanoutResult:
+    """One room broadcast.
+
+    ``enqueue_ms`` only covers handing the frame to each recipient's outbound
+    queue; the writer tasks send it later, and ``lane_stats`` times that wait.
+    """
+
+    recipients: int = 0
+    enqueue_ms: float = 0.0
+    failed: List[str] = field(default_factory=list)
+
+
+@dataclass
+class FanoutStats:
+    broadcasts: int = 0
+    recipients: int = 0
+    failed: int = 0
+    total_enqueue_ms: float = 0.0
+    max_enqueue_ms: float = 0.0
+
+    def record(self, result: FanoutResult):
+        self.broadcasts += 1
+        self.recipients += result.recipients
+        self.failed += len(result.failed)
+        self.total_enqueue_ms += result.enqueue_ms
+        self.max_enqueue_ms = max(self.max_enqueue_ms, result.enqueue_ms)
+
+    def as_dict(self) -> dict:
+        return {
+            "broadcasts": self.broadcasts,
+            "recipients": self.recipients,
+            "failed": self.failed,
+            "avg_enqueue_ms": round(self.total_enqueue_ms / self.broadcasts, 3) if self.broadcasts else 0.0,
+            "max_enqueue_ms": round(self.max_enqueue_ms, 3),
+        }
@@ -2,9 +2,14 @@ import secrets
 import hashlib
 from datetime import datetime, timedelta, timezone
 from typing import Dict, Optional, List
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from threading import Lock
 
+def session_digest(session_id: str) -> str:
+    """What snapshots keep instead of a resumable session id, which is a bearer credential."""
+    return hashlib.sha256(session_id.encode()).hexdigest()
+
+
 @dataclass
 class GuestSession:
     session_id: str
@@ -35,6 +40,8 @@ class GuestSessionManager:
         self._initialized = True
         self._sessions: Dict[str, GuestSession] = {}
         self._room_sessions: Dict[str, Dict[str, GuestSession]] = {}
+        # session_digest -> session restored from a snapshot, until its client presents the id again.
+        self._restored: Dict[str, GuestSession] = {}
         self._session_token_prefix = "guest_"
     
     def _generate_session_id(self) -> str:
@@ -77,6 +84,8 @@ class GuestSessionManager:
     
     def get_session(self, session_id: str) -> Optional[GuestSession]:
         session = self._sessions.get(session_id)
+        if session is None and self._restored:
+            session = self._claim_restored(session_id)
         if session and session.expires_at > datetime.now(timezone.utc):
             return session
         elif session:
@@ -151,6 +160,53 @@ class GuestSessionManager:
                 if not self._room_sessions[room_id]:
                     del self._room_sessions[room_id]
     
+    def _claim_restored(self, session_id: str) -> Optional[GuestSession]:
+        session = self._restored.pop(session_digest(session_id), None)
+        if session is None:
+            return None
+        session.session_id = session_id
+        self._sessions[session_id] = session
+        self._room_sessions.setdefault(session.room_id, {})[session_id] = session
+        return session
+    
+    def export_sessions(self) -> List[dict]:
+        """Live sessions for a snapshot, keyed by digest so the snapshot holds no usable session ids."""
+        now = datetime.now(timezone.utc)
+        entries = [(session_digest(sid), session) for sid, session in self._sessions.items()]
+        entries.extend(self._restored.items())
+        exported = []
+        for digest, session in entries:
+            if session.expires_at <= now:
+                continue
+            data = asdict(session)
+            del data["session_id"]
+            data["session_digest"] = digest
+            data["created_at"] = session.created_at.isoformat()
+            data["expires_at"] = session.expires_at.isoformat()
+            exported.append(data)
+        return exported
+    
+    def restore_sessions(self, sessions: List[dict]) -> int:
+        """Hold exported sessions until a client presents an id matching one of their digests."""
+        now = datetime.now(timezone.utc)
+        restored = 0
+        for data in sessions:
+            data = dict(data)
+            digest = data.pop("session_digest")
+            session = GuestSession(
+                **{
+                    **data,
+                    "session_id": "",
+                    "created_at": datetime.fromisoformat(data["created_at"]),
+                    "expires_at": datetime.fromisoformat(data["expires_at"]),
+                }
+            )
+            if session.expires_at <= now or digest in self._restored:
+                continue
+            self._restored[digest] = session
+            restored += 1
+        return restored
+    
     def cleanup_expired(self):
         now = datetime.now(timezone.utc)
         expired = [
@@ -159,5 +215,7 @@ class GuestSessionManager:
         ]
         for sid in expired:
             self._cleanup_session(sid)
+        for digest in [d for d, s in self._restored.items() if s.expires_at <= now]:
+            del self._restored[digest]
 
 guest_session_manager = GuestSessionManager()
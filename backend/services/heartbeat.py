@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, List, Optional, Set, Union
+
+from backend.core.config import HEARTBEAT_INTERVAL_SECONDS, HEARTBEAT_TIMEOUT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# ping() may enqueue synchronously or return an awaitable send; reap() closes the socket.
+PingCallback = Callable[[], Union[None, bool, Awaitable[None]]]
+ReapCallback = Callable[[], Awaitable[None]]
+
+
+class HeartbeatEntry:
+    """One registered socket; handlers call ``touch`` for every inbound frame."""
+
+    __slots__ = ("label", "ping", "reap", "slot", "last_seen", "answers_pings")
+
+    def __init__(self, label: str, ping: PingCallback, reap: ReapCallback, slot: int):
+        self.label = label
+        self.ping = ping
+        self.reap = reap
+        self.slot = slot
+        self.last_seen = time.monotonic()
+        # Only clients that have answered a ping are held to the timeout; older
+        # clients never send pongs and would otherwise be reaped while idle.
+        self.answers_pings = False
+
+    def touch(self):
+        self.last_seen = time.monotonic()
+
+    def pong(self):
+        self.answers_pings = True
+        self.last_seen = time.monotonic()
+
+
+@dataclass
+class HeartbeatStats:
+    connections: int = 0
+    pings: int = 0
+    reaped: int = 0
+    ticks: int = 0
+    last_lag_ms: float = 0.0
+    max_lag_ms: float = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "connections": self.connections,
+            "pings": self.pings,
+            "reaped": self.reaped,
+            "ticks": self.ticks,
+            "last_lag_ms": round(self.last_lag_ms, 3),
+            "max_lag_ms": round(self.max_lag_ms, 3),
+        }
+
+
+class HeartbeatService:
+    """Pings every registered socket once per ``interval`` from a single timer wheel.
+
+    Sockets are spread round-robin over ``interval / tick`` slots and each tick
+    visits one slot, so the work per tick stays flat no matter how many sockets
+    are open and no socket needs its own sleeping task.
+    """
+
+    def __init__(self, interval: float, timeout: float, tick: float = 1.0):
+        self.tick = tick
+        self.timeout = timeout
+        self.slot_count = max(1, int(round(interval / tick)))
+        self.stats = HeartbeatStats()
+        self._wheel: List[Set[HeartbeatEntry]] = [set() for _ in range(self.slot_count)]
+        self._cursor = 0
+        self._next_slot = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, label: str, ping: PingCallback, reap: ReapCallback) -> HeartbeatEntry:
+        entry = HeartbeatEntry(label, ping, reap, self._next_slot)
+        self._next_slot = (self._next_slot + 1) % self.slot_count
+        self._wheel[entry.slot].add(entry)
+        self.stats.connections += 1
+        return entry
+
+    def unregister(self, entry: HeartbeatEntry):
+        bucket = self._wheel[entry.slot]
+        if entry in bucket:
+            bucket.discard(entry)
+            self.stats.connections -= 1
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
+        while True:
+            deadline += self.tick
+            await asyncio.sleep(max(0.0, deadline - loop.time()))
+            lag_ms = max(0.0, loop.time() - deadline) * 1000
+            self.stats.ticks += 1
+            self.stats.last_lag_ms = lag_ms
+            self.stats.max_lag_ms = max(self.stats.max_lag_ms, lag_ms)
+            if lag_ms > self.tick * 1000:
+                # The loop was blocked for more than a tick; don't try to catch up in a burst.
+                deadline = loop.time()
+            self._cursor = (self._cursor + 1) % self.slot_count
+            try:
+                self._beat(self._wheel[self._cursor])
+            except Exception as exc:
+                logger.warning("Heartbeat tick failed: %s", exc)
+
+    def _beat(self, bucket: Set[HeartbeatEntry]):
+        now = time.monotonic()
+        sends = []
+        for entry in list(bucket):
+            if entry.answers_pings and now - entry.last_seen > self.timeout:
+                self.unregister(entry)
+                self.stats.reaped += 1
+                logger.info("Reaping %s: silent for %.0fs", entry.label, now - entry.last_seen)
+                sends.append(entry.reap())
+                continue
+            result = entry.ping()
+            self.stats.pings += 1
+            if inspect.isawaitable(result):
+                sends.append(result)
+        if sends:
+            asyncio.create_task(self._settle(sends))
+
+    async def _settle(self, sends):
+        results = await asyncio.gather(*sends, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                logger.debug("Heartbeat send failed: %s", result)
+
+
+heartbeat_service = HeartbeatService(HEARTBEAT_INTERVAL_SECONDS, HEARTBEAT_TIMEOUT_SECONDS)
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field, replace
+from threading import Lock
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from backend.services.meeting_cache import MeetingSnapshot
+
+
+def normalize_email_domains(domains: Iterable[str] | None) -> List[str]:
+    """Lowercase, strip a leading "@" and drop blanks/duplicates, keeping the given order."""
+    normalized: List[str] = []
+    for value in domains or ():
+        domain = (value or "").strip().lower().lstrip("@")
+        if domain and domain not in normalized:
+            normalized.append(domain)
+    return normalized
+
+
+def split_email_domains(value: Optional[str]) -> Tuple[str, ...]:
+    """Parse the comma-separated ``Meeting.auto_admit_domains`` column."""
+    return tuple(normalize_email_domains((value or "").split(",")))
+
+
+@dataclass(frozen=True)
+class InviteIndex:
+    """Who the meeting knows about, captured once per room so joins resolve without the DB.
+
+    Never mutated in place: adding invitees swaps in a new index, so a join
+    resolving on a worker thread always sees one consistent copy.
+    """
+
+    owner_id: Optional[int]
+    owner_email: Optional[str]
+    owner_name: Optional[str]
+    # Lowercased email -> Participant.role
+    roles: Dict[str, str] = field(default_factory=dict)
+
+    def role_of(self, email: Optional[str]) -> Optional[str]:
+        return self.roles.get(email) if email else None
+
+    def with_invitees(self, emails: Iterable[str], role: str) -> "InviteIndex":
+        roles = dict(self.roles)
+        for email in emails:
+            roles.setdefault(email, role)
+        return replace(self, roles=roles)
+
+
+def qualifies_for_auto_admit(
+    meeting: "MeetingSnapshot",
+    index: InviteIndex,
+    role: str,
+    email: Optional[str],
+    user_id: Optional[int],
+) -> bool:
+    """Whether a non-host join matches one of the meeting's auto-admit policies."""
+    if meeting.auto_admit_users and user_id and role == "user":
+        return True
+    if not email:
+        return False
+    if meeting.auto_admit_invited and email in index.roles:
+        return True
+    if meeting.auto_admit_domains:
+        return email.rpartition("@")[2] in meeting.auto_admit_domains
+    return False
+
+
+class InviteIndexCache:
+    """Per-room invite indexes, built on the first join and dropped with the room."""
+
+    def __init__(self):
+        self._indexes: Dict[str, InviteIndex] = {}
+        self._lock = Lock()
+
+    def get(self, room_id: str) -> Optional[InviteIndex]:
+        return self._indexes.get(room_id)
+
+    def put(self, room_id: str, index: InviteIndex) -> InviteIndex:
+        with self._lock:
+            self._indexes[room_id] = index
+        return index
+
+    def add_invitees(self, room_id: str, emails: Iterable[str], role: str = "participant") -> None:
+        """Extend the index of a room that is currently cached; no-op otherwise."""
+        with self._lock:
+            index = self._indexes.get(room_id)
+            if index is not None:
+                self._indexes[room_id] = index.with_invitees(emails, role)
+
+    def invalidate(self, room_id: str) -> None:
+        with self._lock:
+            self._indexes.pop(room_id, None)
+
+
+invite_index_cache = InviteIndexCache()
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import Optional, Tuple
+
+from backend.core.config import SIGNALING_DB_THREADS
+from backend.email.db import SessionLocal
+from backend.models.meeting import Meeting
+from backend.models.participant import Participant
+from backend.models.user import User
+from backend.services.invite_index import InviteIndex, invite_index_cache, qualifies_for_auto_admit
+from backend.services.meeting_cache import MeetingSnapshot, meeting_cache
+from backend.services.permission_service import resolve_role
+
+# Signaling DB work runs here so a slow query never blocks the event loop,
+# and the pool size bounds how many connections signaling can hold at once.
+_db_executor = ThreadPoolExecutor(max_workers=SIGNALING_DB_THREADS, thread_name_prefix="signaling-db")
+
+
+@dataclass(frozen=True)
+class JoinContext:
+    meeting: MeetingSnapshot
+    role: str
+    # Set when the joining user was recognised as the meeting owner.
+    display_name: Optional[str] = None
+    # Set when a non-host join matches one of the meeting's auto-admit policies.
+    auto_admit: bool = False
+
+
+def _load_room(room_id: str) -> Optional[Tuple[MeetingSnapshot, InviteIndex]]:
+    """Fetch meeting, owner and every invitee once, and cache them for the room's lifetime."""
+    db = SessionLocal()
+    try:
+        row = (
+            db.query(Meeting, User)
+            .outerjoin(User, User.id == Meeting.owner_id)
+            .filter(Meeting.room_id == room_id)
+            .first()
+        )
+        if not row:
+            return None
+        meeting, owner = row
+        invitees = (
+            db.query(Participant.email, Participant.role)
+            # Attendance-only rows are not invitations.
+            .filter(Participant.meeting_id == meeting.id, Participant.email.isnot(None), Participant.role != "guest")
+            .all()
+        )
+        owner_email = owner.email.lower() if owner and owner.email else None
+        index = InviteIndex(
+            owner_id=meeting.owner_id,
+            owner_email=owner_email,
+            owner_name=(owner.name or owner.email) if owner else None,
+            roles={email.strip().lower(): role for email, role in invitees if email and email.strip()},
+        )
+        snapshot = meeting_cache.put(MeetingSnapshot.from_meeting(meeting))
+        return snapshot, invite_index_cache.put(room_id, index)
+    finally:
+        db.close()
+
+
+def resolve_join(
+    room_id: str,
+    token_email: Optional[str],
+    token_user_id: Optional[int],
+    requested_host: bool,
+    session_is_host: bool,
+) -> Optional[JoinContext]:
+    """Resolve the join role, hitting the DB only for the first join of a room."""
+    snapshot = meeting_cache.get(room_id)
+    index = invite_index_cache.get(room_id)
+    if snapshot is None or index is None:
+        loaded = _load_room(room_id)
+        if loaded is None:
+            return None
+        snapshot, index = loaded
+
+    role = "host" if session_is_host else "guest"
+    display_name = None
+    if role != "host" and requested_host and token_email and index.owner_email == token_email:
+        role = "host"
+        display_name = index.owner_name
+
+    if role != "host":
+        role = resolve_role(snapshot.owner_id, index.role_of(token_email), token_user_id)
+
+    auto_admit = role != "host" and qualifies_for_auto_admit(snapshot, index, role, token_email, token_user_id)
+    return JoinContext(meeting=snapshot, role=role, display_name=display_name, auto_admit=auto_admit)
+
+
+def _load_snapshot(room_id: str) -> Optional[MeetingSnapshot]:
+    db = SessionLocal()
+    try:
+        return meeting_cache.load(room_id, db)
+    finally:
+        db.close()
+
+
+async def resolve_join_async(
+    room_id: str,
+    token_email: Optional[str],
+    token_user_id: Optional[int],
+    requested_host: bool,
+    session_is_host: bool,
+) -> Optional[JoinContext]:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _db_executor,
+        partial(resolve_join, room_id, token_email, token_user_id, requested_host, session_is_host),
+    )
+
+
+async def load_meeting_snapshot(room_id: str) -> Optional[MeetingSnapshot]:
+    snapshot = meeting_cache.get(room_id)
+    if snapshot:
+        return snapshot
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_db_executor, _load_snapshot, room_id)
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from threading import Lock
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from backend.models.meeting import Meeting
+from backend.services.invite_index import split_email_domains
+
+
+@dataclass(frozen=True)
+class MeetingSnapshot:
+    """Immutable copy of the meeting fields signaling needs for permission checks."""
+
+    id: int
+    room_id: str
+    owner_id: Optional[int]
+    waiting_room: bool
+    allow_guest: bool
+    allow_user_ai: bool
+    allow_user_captions: bool
+    allow_guest_screen_share: bool
+    allow_user_screen_share: bool
+    webinar_mode: bool = False
+    auto_admit_invited: bool = False
+    auto_admit_users: bool = False
+    auto_admit_domains: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_meeting(cls, meeting: Meeting) -> "MeetingSnapshot":
+        return cls(
+            id=meeting.id,
+            room_id=meeting.room_id,
+            owner_id=meeting.owner_id,
+            waiting_room=bool(meeting.waiting_room),
+            allow_guest=bool(meeting.allow_guest),
+            allow_user_ai=bool(meeting.allow_user_ai),
+            allow_user_captions=bool(meeting.allow_user_captions),
+            allow_guest_screen_share=bool(meeting.allow_guest_screen_share),
+            allow_user_screen_share=bool(meeting.allow_user_screen_share),
+            webinar_mode=bool(meeting.webinar_mode),
+            auto_admit_invited=bool(meeting.auto_admit_invited),
+            auto_admit_users=bool(meeting.auto_admit_users),
+            auto_admit_domains=split_email_domains(meeting.auto_admit_domains),
+        )
+
+
+class MeetingCache:
+    """Per-room meeting snapshots so signaling permission checks never touch the DB."""
+
+    def __init__(self):
+        self._snapshots: Dict[str, MeetingSnapshot] = {}
+        self._lock = Lock()
+
+    def get(self, room_id: str) -> Optional[MeetingSnapshot]:
+        return self._snapshots.get(room_id)
+
+    def store(self, meeting: Meeting) -> MeetingSnapshot:
+        return self.put(MeetingSnapshot.from_meeting(meeting))
+
+    def put(self, snapshot: MeetingSnapshot) -> MeetingSnapshot:
+        with self._lock:
+            self._snapshots[snapshot.room_id] = snapshot
+        return snapshot
+
+    def load(self, room_id: str, db: Session) -> Optional[MeetingSnapshot]:
+        snapshot = self._snapshots.get(room_id)
+        if snapshot:
+            return snapshot
+        meeting = db.query(Meeting).filter(Meeting.room_id == room_id).first()
+        if not meeting:
+            return None
+        return self.store(meeting)
+
+    def refresh(self, meeting: Meeting) -> None:
+        """Replace the snapshot of a room that is currently cached; no-op otherwise."""
+        with self._lock:
+            if meeting.room_id in self._snapshots:
+                self._snapshots[meeting.room_id] = MeetingSnapshot.from_meeting(meeting)
+
+    def invalidate(self, room_id: str) -> None:
+        with self._lock:
+            self._snapshots.pop(room_id, None)
+
+
+meeting_cache = MeetingCache()
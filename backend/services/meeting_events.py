@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import insert
+
+from backend.core.config import (
+    MEETING_EVENTS_ENABLED,
+    WRITE_BEHIND_BATCH_SIZE,
+    WRITE_BEHIND_INTERVAL_MS,
+    WRITE_BEHIND_MAX_PENDING,
+)
+from backend.email.db import SessionLocal
+from backend.models.meeting_event import MeetingEvent
+from backend.services.meeting_cache import meeting_cache
+from backend.services.write_behind import WriteBehindBatcher
+
+EVENT_WAITING = "waiting"
+# Left the waiting room without an answer: gave up, or the host left and closed it.
+EVENT_WAITING_LEFT = "waiting-left"
+EVENT_ADMIT = "admit"
+EVENT_DENY = "deny"
+EVENT_JOIN = "join"
+EVENT_LEAVE = "leave"
+EVENT_MUTE = "mute"
+EVENT_SCREEN_SHARE = "screen-share"
+EVENT_HOST_TRANSFER = "host-transfer"
+
+
+def _insert_meeting_events(rows: List[dict]):
+    db = SessionLocal()
+    try:
+        db.execute(insert(MeetingEvent), rows)
+        db.commit()
+    finally:
+        db.close()
+
+
+event_log: WriteBehindBatcher[dict] = WriteBehindBatcher(
+    "meeting_events",
+    _insert_meeting_events,
+    batch_size=WRITE_BEHIND_BATCH_SIZE,
+    interval=WRITE_BEHIND_INTERVAL_MS / 1000,
+    max_pending=WRITE_BEHIND_MAX_PENDING,
+)
+
+
+def log_event(
+    room_id: str,
+    event: str,
+    client_id: str,
+    actor_id: Optional[str] = None,
+    detail: Optional[str] = None,
+    at: Optional[datetime] = None,
+):
+    """Append one timeline entry; it reaches the DB with the next batch."""
+    if not MEETING_EVENTS_ENABLED:
+        return
+    meeting = meeting_cache.get(room_id)
+    event_log.add({
+        "room_id": room_id,
+        "meeting_id": meeting.id if meeting else None,
+        "event": event,
+        "client_id": client_id[:255],
+        "actor_client_id": actor_id[:255] if actor_id else None,
+        "detail": detail[:64] if detail else None,
+        "occurred_at": at or datetime.now(timezone.utc),
+    })
+
+
+def _seconds(values: List[float]) -> dict:
+    if not values:
+        return {"count": 0, "avg_seconds": 0.0, "max_seconds": 0.0, "total_seconds": 0.0}
+    total = sum(values)
+    return {
+        "count": len(values),
+        "avg_seconds": round(total / len(values), 1),
+        "max_seconds": round(max(values), 1),
+        "total_seconds": round(total, 1),
+    }
+
+
+def summarize_timeline(rows: Iterable[Tuple[str, str, datetime]]) -> dict:
+    """Aggregate (event, client_id, occurred_at) rows, oldest first, in a single pass."""
+    counts: Counter = Counter()
+    waiting_since: Dict[str, datetime] = {}
+    present_since: Dict[str, datetime] = {}
+    waits: List[float] = []
+    stays: List[float] = []
+    per_client: Counter = Counter()
+    peak = 0
+    peak_at = first = last = None
+
+    for event, client_id, occurred_at in rows:
+        counts[event] += 1
+        first = first or occurred_at
+        last = occurred_at
+        if event == EVENT_WAITING:
+            waiting_since.setdefault(client_id, occurred_at)
+        elif event == EVENT_ADMIT:
+            started = waiting_since.pop(client_id, None)
+            if started is not None:
+                waits.append((occurred_at - started).total_seconds())
+        elif event in (EVENT_DENY, EVENT_WAITING_LEFT):
+            waiting_since.pop(client_id, None)
+        elif event == EVENT_JOIN:
+            if client_id not in present_since:
+                present_since[client_id] = occurred_at
+                if len(present_since) > peak:
+                    peak, peak_at = len(present_since), occurred_at
+        elif event == EVENT_LEAVE:
+            started = present_since.pop(client_id, None)
+            if started is not None:
+                stay = (occurred_at - started).total_seconds()
+                stays.append(stay)
+                per_client[client_id] += stay
+
+    return {
+        "events": dict(counts),
+        "first_event_at": first.isoformat() if first else None,
+        "last_event_at": last.isoformat() if last else None,
+        "span_seconds": round((last - first).total_seconds(), 1) if first else 0.0,
+        "peak_concurrency": peak,
+        "peak_at": peak_at.isoformat() if peak_at else None,
+        "unique_participants": len(set(per_client) | set(present_since)),
+        "still_present": len(present_since),
+        "waiting_room": {
+            **_seconds(waits),
+            "admitted": counts[EVENT_ADMIT],
+            "denied": counts[EVENT_DENY],
+            "abandoned": counts[EVENT_WAITING_LEFT],
+            "still_waiting": len(waiting_since),
+        },
+        "stays": _seconds(stays),
+        "time_in_meeting": _seconds(list(per_client.values())),
+    }
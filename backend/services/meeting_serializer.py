@@ -4,6 +4,7 @@ from collections import defaultdict
 from datetime import datetime
 from typing import Iterable
 
+from backend.services.invite_index import split_email_domains
 from backend.services.time_service import (
     APP_TIMEZONE_NAME,
     compute_meeting_flags,
@@ -12,7 +13,12 @@ from backend.services.time_service import (
 )
 
 
-def serialize_meeting(meeting, now_utc: datetime | None = None, role: str | None = None) -> dict:
+def serialize_meeting(
+    meeting,
+    now_utc: datetime | None = None,
+    role: str | None = None,
+    live: dict | None = None,
+) -> dict:
     start_dt = ensure_utc(getattr(meeting, "scheduled_start", None))
     end_dt = ensure_utc(getattr(meeting, "scheduled_end", None))
     local_start = to_app_timezone(start_dt)
@@ -28,7 +34,7 @@ def serialize_meeting(meeting, now_utc: datetime | None = None, role: str | None
     stored_status = getattr(meeting, "status", None)
     status = stored_status or computed_status
 
-    return {
+    serialized = {
         "id": meeting.id,
         "meeting_id": meeting.id,
         "title": meeting.title,
@@ -58,16 +64,30 @@ def serialize_meeting(meeting, now_utc: datetime | None = None, role: str | None
             "allow_user_captions": bool(getattr(meeting, "allow_user_captions", False)),
             "allow_guest_screen_share": bool(getattr(meeting, "allow_guest_screen_share", False)),
             "allow_user_screen_share": bool(getattr(meeting, "allow_user_screen_share", False)),
+            "webinar_mode": bool(getattr(meeting, "webinar_mode", False)),
+            "auto_admit_invited": bool(getattr(meeting, "auto_admit_invited", False)),
+            "auto_admit_users": bool(getattr(meeting, "auto_admit_users", False)),
+            "auto_admit_domains": list(split_email_domains(getattr(meeting, "auto_admit_domains", None))),
         },
     }
+    if live is not None:
+        # Signaling occupancy, only when the caller asked for it; is_live above is schedule-based.
+        serialized["live"] = live
+    return serialized
 
 
-def group_meetings_by_local_date(meetings: Iterable, now_utc: datetime | None = None, role_resolver=None) -> dict[str, list[dict]]:
+def group_meetings_by_local_date(
+    meetings: Iterable,
+    now_utc: datetime | None = None,
+    role_resolver=None,
+    live_counts: dict[str, dict] | None = None,
+) -> dict[str, list[dict]]:
     grouped = defaultdict(list)
 
     for meeting in meetings:
         role = role_resolver(meeting) if role_resolver else None
-        serialized = serialize_meeting(meeting, now_utc=now_utc, role=role)
+        live = live_counts.get(meeting.room_id) if live_counts is not None else None
+        serialized = serialize_meeting(meeting, now_utc=now_utc, role=role, live=live)
         local_start = serialized.get("local_start")
 
         if local_start:
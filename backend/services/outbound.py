@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Hashable, List, Optional, Tuple
+
+from fastapi import WebSocket
+
+try:
+    import orjson
+except Exception:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+DROP_OLDEST = "drop_oldest"
+COALESCE = "coalesce"
+DISCONNECT = "disconnect"
+OVERFLOW_POLICIES = {DROP_OLDEST, COALESCE, DISCONNECT}
+
+# Messages whose latest value supersedes any still-queued one from the same sender.
+COALESCIBLE_TYPES = {"update-state", "audio-toggle", "video-toggle"}
+
+# Per-connection priority lanes, always drained in this order: host controls, membership,
+# SDP/ICE and errors first, then chat, then presence chatter.
+LANE_CONTROL = 0
+LANE_CHAT = 1
+LANE_PRESENCE = 2
+LANE_NAMES = ("control", "chat", "presence")
+
+# Anything not listed here rides the control lane.
+LANE_BY_TYPE = {
+    "chat-message": LANE_CHAT,
+    "private-message": LANE_CHAT,
+    "chat-history": LANE_CHAT,
+    "presence": LANE_PRESENCE,
+    "update-state": LANE_PRESENCE,
+    "audio-toggle": LANE_PRESENCE,
+    "video-toggle": LANE_PRESENCE,
+    "participant-count": LANE_PRESENCE,
+}
+
+
+def encode_payload(payload: dict) -> str:
+    """Serialize a signaling payload once so the same text can go to every recipient."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(payload).decode()
+        except TypeError:
+            # e.g. integers beyond 64 bits echoed back from a client message
+            pass
+    return json.dumps(payload, separators=(",", ":"))
+
+
+def coalesce_key_for(payload: dict) -> Optional[Hashable]:
+    msg_type = payload.get("type")
+    if msg_type in COALESCIBLE_TYPES:
+        return msg_type, payload.get("from")
+    return None
+
+
+def lane_for(payload: dict) -> int:
+    return LANE_BY_TYPE.get(payload.get("type"), LANE_CONTROL)
+
+
+class LaneStats:
+    """Queueing delay per lane across every outbound connection in this process."""
+
+    def __init__(self):
+        self.sent = [0] * len(LANE_NAMES)
+        self.dropped = [0] * len(LANE_NAMES)
+        self.total_ms = [0.0] * len(LANE_NAMES)
+        self.max_ms = [0.0] * len(LANE_NAMES)
+
+    def record(self, lane: int, delay_ms: float):
+        self.sent[lane] += 1
+        self.total_ms[lane] += delay_ms
+        if delay_ms > self.max_ms[lane]:
+            self.max_ms[lane] = delay_ms
+
+    def as_dict(self) -> dict:
+        return {
+            name: {
+                "sent": self.sent[lane],
+                "dropped": self.dropped[lane],
+                "avg_delay_ms": round(self.total_ms[lane] / self.sent[lane], 3) if self.sent[lane] else 0.0,
+                "max_delay_ms": round(self.max_ms[lane], 3),
+            }
+            for lane, name in enumerate(LANE_NAMES)
+        }
+
+
+lane_stats = LaneStats()
+
+
+class OutboundConnection:
+    """Bounded outbound queue for one WebSocket, drained by a dedicated writer task.
+
+    Handlers only ever enqueue, so a slow peer can never stall the coroutine
+    that is processing someone else's message. Frames wait in priority lanes:
+    the writer always sends the highest non-empty lane first, and an overflow
+    evicts from the lowest one, so a mute never queues behind a chat backlog.
+    """
+
+    def __init__(self, ws: WebSocket, max_size: int, policy: str, send_timeout: float):
+        self.ws = ws
+        self.max_size = max(1, max_size)
+        self.policy = policy if policy in OVERFLOW_POLICIES else DROP_OLDEST
+        self.send_timeout = send_timeout
+        self.dropped = 0
+        self.coalesced = 0
+        self.closed = False
+        # Entries are [coalesce_key, text, enqueued_at] lists so a coalesced update can be swapped in place.
+        self._lanes: Tuple[Deque[List[Any]], ...] = tuple(deque() for _ in LANE_NAMES)
+        self._size = 0
+        self._pending: Dict[Hashable, List[Any]] = {}
+        self._wakeup = asyncio.Event()
+        self._drained = asyncio.Event()
+        self._drained.set()
+        self._writer = asyncio.create_task(self._write_loop())
+
+    @property
+    def queued(self) -> int:
+        return self._size
+
+    def send(self, payload: dict) -> bool:
+        return self.send_text(encode_payload(payload), coalesce_key_for(payload), lane_for(payload))
+
+    def send_text(self, text: str, coalesce_key: Optional[Hashable] = None, lane: int = LANE_CONTROL) -> bool:
+        """Queue ``text`` for delivery; returns False if the connection was dropped."""
+        if self.closed:
+            return False
+
+        if coalesce_key is not None and self.policy == COALESCE:
+            entry = self._pending.get(coalesce_key)
+            if entry is not None:
+                entry[1] = text
+                self.coalesced += 1
+                return True
+
+        if self._size >= self.max_size:
+            if self.policy == DISCONNECT:
+                logger.warning("Outbound queue overflow (%d); disconnecting client", self.max_size)
+                self.closed = True
+                self._writer.cancel()
+                asyncio.create_task(self._shutdown())
+                return False
+            self._evict_oldest()
+
+        entry = [coalesce_key, text, time.perf_counter()]
+        self._lanes[lane].append(entry)
+        self._size += 1
+        if coalesce_key is not None and self.policy == COALESCE:
+            self._pending[coalesce_key] = entry
+        self._drained.clear()
+        self._wakeup.set()
+        return True
+
+    def _evict_oldest(self):
+        lanes = self._lanes
+        lane = LANE_PRESENCE
+        while not lanes[lane]:
+            lane -= 1
+        entry = lanes[lane].popleft()
+        self._size -= 1
+        self._forget(entry)
+        self.dropped += 1
+        lane_stats.dropped[lane] += 1
+
+    def _next_entry(self) -> Tuple[int, List[Any]]:
+        for lane, queue in enumerate(self._lanes):
+            if queue:
+                self._size -= 1
+                return lane, queue.popleft()
+        raise IndexError("outbound queue is empty")
+
+    def _forget(self, entry: List[Any]):
+        key = entry[0]
+        if key is not None and self._pending.get(key) is entry:
+            del self._pending[key]
+
+    async def _write_loop(self):
+        try:
+            # Checked each pass as well as cancelled: on 3.11 a cancel that races a finishing
+            # wait_for() can be swallowed, which would leave this task waiting forever.
+            while not self.closed:
+                if not self._size:
+                    self._drained.set()
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+                lane, entry = self._next_entry()
+                self._forget(entry)
+                lane_stats.record(lane, (time.perf_counter() - entry[2]) * 1000)
+                await asyncio.wait_for(self.ws.send_text(entry[1]), self.send_timeout)
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            logger.warning("Outbound send timed out after %.1fs; disconnecting client", self.send_timeout)
+            await self._shutdown()
+        except Exception as exc:
+            logger.warning("Outbound send failed: %s", exc)
+            await self._shutdown()
+
+    async def _shutdown(self):
+        self.closed = True
+        for queue in self._lanes:
+            queue.clear()
+        self._size = 0
+        self._pending.clear()
+        self._drained.set()
+        self._wakeup.set()
+        try:
+            await self.ws.close()
+        except Exception:
+            pass
+
+    async def close(self, flush: bool = True):
+        """Stop the writer, optionally delivering what is already queued first."""
+        if flush and not self.closed:
+            try:
+                await asyncio.wait_for(self._drained.wait(), self.send_timeout)
+            except asyncio.TimeoutError:
+                pass
+        self._writer.cancel()
+        if not self.closed:
+            await self._shutdown()
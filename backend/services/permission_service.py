@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from backend.models.meeting import Meeting
 from backend.models.participant import Participant
+from backend.services.meeting_cache import MeetingSnapshot
 
 HOST_ONLY_ACTIONS = {
     "start_meeting",
@@ -15,10 +16,12 @@ HOST_ONLY_ACTIONS = {
     "start_recording",
     "stop_recording",
     "update_permissions",
+    "manage_presenters",
+    "manage_breakouts",
 }
 
 
-def check_permission(role: str, action: str, meeting: Meeting) -> tuple[bool, str]:
+def check_permission(role: str, action: str, meeting: Meeting | MeetingSnapshot) -> tuple[bool, str]:
     role = (role or "guest").lower()
     action = (action or "").lower()
 
@@ -67,12 +70,15 @@ def check_permission(role: str, action: str, meeting: Meeting) -> tuple[bool, st
     return False, "Permission denied"
 
 
-def resolve_role_for_user(meeting: Meeting, participant_row: Participant | None, user_id: int | None) -> str:
-    if user_id and meeting.owner_id and user_id == meeting.owner_id:
+def resolve_role(owner_id: int | None, participant_role: str | None, user_id: int | None) -> str:
+    if user_id and owner_id and user_id == owner_id:
+        return "host"
+    if participant_role == "host":
         return "host"
-    if participant_row:
-        if participant_row.role == "host":
-            return "host"
-        if participant_row.role in {"participant", "user"}:
-            return "user"
+    if participant_role in {"participant", "user"}:
+        return "user"
     return "guest"
+
+
+def resolve_role_for_user(meeting: Meeting, participant_row: Participant | None, user_id: int | None) -> str:
+    return resolve_role(meeting.owner_id, participant_row.role if participant_row else None, user_id)
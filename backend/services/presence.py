@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# flush(room_id, changes) where each change is {"id": client_id, <field>: <new value>, ...}
+PresenceFlush = Callable[[str, List[dict]], Awaitable[None]]
+
+
+class PresenceAggregator:
+    """Batches participant media-state changes per room into one delta frame per interval.
+
+    The first change in a room arms a single timer; everything recorded until it
+    fires goes out together, keeping only the fields whose value actually moved
+    (a mute/unmute burst inside one window sends nothing).
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._flush: Optional[PresenceFlush] = None
+        # room_id -> client_id -> field -> [value before the window, latest value]
+        self._pending: Dict[str, Dict[str, Dict[str, List[Any]]]] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 0
+
+    def bind(self, flush: PresenceFlush):
+        self._flush = flush
+
+    def record(self, room_id: str, client_id: str, changes: Dict[str, Tuple[Any, Any]]):
+        if not changes:
+            return
+        fields = self._pending.setdefault(room_id, {}).setdefault(client_id, {})
+        for name, (old, new) in changes.items():
+            entry = fields.get(name)
+            if entry is None:
+                fields[name] = [old, new]
+            else:
+                entry[1] = new
+        if room_id not in self._timers:
+            self._timers[room_id] = asyncio.get_running_loop().call_later(self.interval, self._fire, room_id)
+
+    def discard(self, room_id: str):
+        timer = self._timers.pop(room_id, None)
+        if timer is not None:
+            timer.cancel()
+        self._pending.pop(room_id, None)
+
+    def _fire(self, room_id: str):
+        self._timers.pop(room_id, None)
+        pending = self._pending.pop(room_id, None)
+        if not pending:
+            return
+        changes = []
+        for client_id, fields in pending.items():
+            delta = {name: new for name, (old, new) in fields.items() if new != old}
+            if delta:
+                changes.append({"id": client_id, **delta})
+        if changes:
+            asyncio.create_task(self._send(room_id, changes))
+
+    async def _send(self, room_id: str, changes: List[dict]):
+        try:
+            await self._flush(room_id, changes)
+        except Exception as exc:
+            logger.warning("Presence flush failed for room %s: %s", room_id, exc)
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import uuid
+from collections import defaultdict
+from typing import AsyncIterator, Callable, Dict, Hashable, Optional, Set, Tuple
+
+from backend.services.outbound import LANE_CONTROL
+from backend.services.room_state import AUDIENCE_ALL
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "signaling:room:"
+
+# deliver_room(room_id, text, coalesce_key, exclude_id, audience, lane)
+# and deliver_direct(room_id, target_id, text, lane) -> delivered
+RoomDelivery = Callable[[str, str, Optional[Hashable], str, str, int], None]
+DirectDelivery = Callable[[str, str, str, int], bool]
+
+
+class RoomBus:
+    """Routes room broadcasts and direct relays to the sockets that own the recipients.
+
+    The base implementation only knows about this process; ``BrokerRoomBus``
+    also forwards frames through a pub/sub broker.
+    """
+
+    def __init__(self):
+        self._deliver_room: Optional[RoomDelivery] = None
+        self._deliver_direct: Optional[DirectDelivery] = None
+
+    def bind(self, deliver_room: RoomDelivery, deliver_direct: DirectDelivery):
+        self._deliver_room = deliver_room
+        self._deliver_direct = deliver_direct
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def watch(self, room_id: str):
+        """Called when the first local client joins ``room_id``."""
+
+    async def unwatch(self, room_id: str):
+        """Called when ``room_id`` has no local clients left."""
+
+    async def publish_room(
+        self,
+        room_id: str,
+        text: str,
+        coalesce_key: Optional[Hashable] = None,
+        exclude_id: str = "",
+        audience: str = AUDIENCE_ALL,
+        lane: int = LANE_CONTROL,
+    ):
+        self._deliver_room(room_id, text, coalesce_key, exclude_id, audience, lane)
+
+    async def publish_direct(self, room_id: str, target_id: str, text: str, lane: int = LANE_CONTROL) -> bool:
+        return self._deliver_direct(room_id, target_id, text, lane)
+
+
+class InProcessRoomBus(RoomBus):
+    """Single-worker bus: every recipient lives in this process."""
+
+
+class InMemoryBroker:
+    """Pub/sub broker living in this process; lets several buses act as separate workers."""
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set["InMemoryBrokerConnection"]] = defaultdict(set)
+
+    def connect(self) -> "InMemoryBrokerConnection":
+        return InMemoryBrokerConnection(self)
+
+    def _publish(self, channel: str, data: str):
+        for conn in list(self._subscribers.get(channel, ())):
+            conn._inbox.put_nowait((channel, data))
+
+
+class InMemoryBrokerConnection:
+    def __init__(self, broker: InMemoryBroker):
+        self._broker = broker
+        self._inbox: asyncio.Queue = asyncio.Queue()
+        self._channels: Set[str] = set()
+
+    async def publish(self, channel: str, data: str):
+        self._broker._publish(channel, data)
+
+    async def subscribe(self, channel: str):
+        self._channels.add(channel)
+        self._broker._subscribers[channel].add(self)
+
+    async def unsubscribe(self, channel: str):
+        self._channels.discard(channel)
+        subscribers = self._broker._subscribers.get(channel)
+        if subscribers is not None:
+            subscribers.discard(self)
+            if not subscribers:
+                del self._broker._subscribers[channel]
+
+    async def listen(self) -> AsyncIterator[Tuple[str, str]]:
+        while True:
+            yield await self._inbox.get()
+
+    async def close(self):
+        for channel in list(self._channels):
+            await self.unsubscribe(channel)
+
+
+class BrokerRoomBus(RoomBus):
+    """Delivers locally first, then relays through a pub/sub broker to the other buses on it.
+
+    Only broadcast and direct-relay frames cross the broker. Seats, the
+    waiting room, the host and the roster stay with the bus that accepted
+    the socket, so this does not let one room span uvicorn workers, and the
+    app always runs the in-process bus. A broker connection provides
+    ``publish``, ``subscribe``, ``unsubscribe``, ``listen`` and ``close``,
+    as ``InMemoryBroker`` connections do.
+    """
+
+    def __init__(self, connection):
+        super().__init__()
+        self.instance_id = uuid.uuid4().hex
+        self._connection = connection
+        self._reader: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if self._reader is None:
+            self._reader = asyncio.create_task(self._read_loop())
+
+    async def stop(self):
+        if self._reader is not None:
+            self._reader.cancel()
+            self._reader = None
+        await self._connection.close()
+
+    async def watch(self, room_id: str):
+        await self._connection.subscribe(CHANNEL_PREFIX + room_id)
+
+    async def unwatch(self, room_id: str):
+        await self._connection.unsubscribe(CHANNEL_PREFIX + room_id)
+
+    async def publish_room(
+        self,
+        room_id: str,
+        text: str,
+        coalesce_key: Optional[Hashable] = None,
+        exclude_id: str = "",
+        audience: str = AUDIENCE_ALL,
+        lane: int = LANE_CONTROL,
+    ):
+        self._deliver_room(room_id, text, coalesce_key, exclude_id, audience, lane)
+        await self._publish(
+            room_id,
+            {"k": "room", "t": text, "c": coalesce_key, "x": exclude_id, "a": audience, "l": lane},
+        )
+
+    async def publish_direct(self, room_id: str, target_id: str, text: str, lane: int = LANE_CONTROL) -> bool:
+        if self._deliver_direct(room_id, target_id, text, lane):
+            return True
+        await self._publish(room_id, {"k": "direct", "t": text, "to": target_id, "l": lane})
+        return False
+
+    async def _publish(self, room_id: str, envelope: dict):
+        envelope["o"] = self.instance_id
+        envelope["r"] = room_id
+        try:
+            await self._connection.publish(CHANNEL_PREFIX + room_id, json.dumps(envelope))
+        except Exception as exc:
+            logger.warning("Room bus publish failed for %s: %s", room_id, exc)
+
+    async def _read_loop(self):
+        while True:
+            try:
+                async for _, data in self._connection.listen():
+                    self._handle(data)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("Room bus listener error: %s", exc)
+                await asyncio.sleep(1.0)
+
+    def _handle(self, data: str):
+        envelope = json.loads(data)
+        if envelope.get("o") == self.instance_id:
+            return
+        if envelope["k"] == "room":
+            coalesce_key = envelope.get("c")
+            self._deliver_room(
+                envelope["r"],
+                envelope["t"],
+                tuple(coalesce_key) if coalesce_key else None,
+                envelope.get("x", ""),
+                envelope.get("a", AUDIENCE_ALL),
+                envelope.get("l", LANE_CONTROL),
+            )
+        elif envelope["k"] == "direct":
+            self._deliver_direct(envelope["r"], envelope["to"], envelope["t"], envelope.get("l", LANE_CONTROL))
+
@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import re
+import socket
+import time
+from typing import Awaitable, Callable, Optional
+
+from backend.core.config import (
+    REDIS_URL,
+    SIGNALING_INSTANCE_ID,
+    SIGNALING_SNAPSHOT_BACKEND,
+    SIGNALING_SNAPSHOT_INTERVAL_SECONDS,
+    SIGNALING_SNAPSHOT_MAX_AGE_SECONDS,
+    SIGNALING_SNAPSHOT_PATH,
+)
+from backend.services.guest_session import guest_session_manager
+from backend.services.room_state import RoomState, room_registry
+
+logger = logging.getLogger(__name__)
+
+# 2: session ids are stored as digests only.
+SNAPSHOT_VERSION = 2
+REDIS_SNAPSHOT_KEY = "signaling:snapshot"
+
+# restore_room(room) puts a restored room back into service (bus subscription, resume timers).
+RestoreRoom = Callable[[RoomState], Awaitable[None]]
+
+
+def snapshot_instance_id() -> str:
+    """Filename- and key-safe id of this worker's snapshot."""
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", SIGNALING_INSTANCE_ID or socket.gethostname()) or "default"
+
+
+def instance_snapshot_path(path: str, instance_id: str) -> str:
+    """``signaling_snapshot.json`` becomes ``signaling_snapshot.<instance>.json``."""
+    root, ext = os.path.splitext(path)
+    return f"{root}.{instance_id}{ext}"
+
+
+class FileSnapshotStore:
+    def __init__(self, path: str):
+        self.path = path
+
+    async def save(self, data: str):
+        await asyncio.to_thread(self._write, data)
+
+    async def load(self) -> Optional[str]:
+        return await asyncio.to_thread(self._read)
+
+    def _write(self, data: str):
+        # Write then rename, so a crash mid-write never leaves a truncated snapshot behind.
+        tmp_path = f"{self.path}.tmp"
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        # Owner-only: the snapshot still names every seat and guest session in the process.
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with open(fd, "w", encoding="utf-8") as handle:
+            handle.write(data)
+        os.replace(tmp_path, self.path)
+
+    def _read(self) -> Optional[str]:
+        try:
+            with open(self.path, encoding="utf-8") as handle:
+                return handle.read()
+        except FileNotFoundError:
+            return None
+
+    async def close(self):
+        pass
+
+
+class RedisSnapshotStore:
+    def __init__(self, url: str, key: str):
+        import redis.asyncio as aioredis
+
+        self._redis = aioredis.from_url(url, decode_responses=True)
+        self.key = key
+
+    async def save(self, data: str):
+        await self._redis.set(self.key, data)
+
+    async def load(self) -> Optional[str]:
+        return await self._redis.get(self.key)
+
+    async def close(self):
+        await self._redis.aclose()
+
+
+class RoomSnapshotService:
+    """Periodically saves admitted seats and guest sessions so a restart can pick them up again.
+
+    On startup every saved seat comes back suspended: its client resumes with
+    the session id it already holds and keeps its role and host status
+    without going through the waiting room again. Session ids are bearer
+    credentials, so only their digests are written out.
+    """
+
+    def __init__(self, store, interval: float, max_age: float):
+        self.store = store
+        self.interval = interval
+        self.max_age = max_age
+        self._restore_room: Optional[RestoreRoom] = None
+        self._task: Optional[asyncio.Task] = None
+        self._last_saved: Optional[str] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.store is not None
+
+    def bind(self, restore_room: RestoreRoom):
+        self._restore_room = restore_room
+
+    def collect(self) -> dict:
+        return {
+            "version": SNAPSHOT_VERSION,
+            "saved_at": time.time(),
+            "rooms": [room.snapshot() for _, room in room_registry.items() if room.participants],
+            "guest_sessions": guest_session_manager.export_sessions(),
+        }
+
+    async def save(self):
+        snapshot = self.collect()
+        # saved_at changes every time; compare the rest to skip rewriting an idle snapshot.
+        fingerprint = json.dumps({**snapshot, "saved_at": None}, separators=(",", ":"))
+        if fingerprint == self._last_saved:
+            return
+        await self.store.save(json.dumps(snapshot, separators=(",", ":")))
+        self._last_saved = fingerprint
+
+    async def restore(self) -> int:
+        """Load the last snapshot into the room registry; returns the number of rooms restored."""
+        if not self.enabled:
+            return 0
+        try:
+            raw = await self.store.load()
+        except Exception as exc:
+            logger.warning("Could not read signaling snapshot: %s", exc)
+            return 0
+        if not raw:
+            return 0
+        try:
+            snapshot = json.loads(raw)
+        except ValueError as exc:
+            logger.warning("Ignoring unreadable signaling snapshot: %s", exc)
+            return 0
+        if snapshot.get("version") != SNAPSHOT_VERSION:
+            return 0
+        age = time.time() - float(snapshot.get("saved_at", 0))
+        if age > self.max_age:
+            logger.info("Ignoring signaling snapshot from %.0f s ago", age)
+            return 0
+
+        sessions = guest_session_manager.restore_sessions(snapshot.get("guest_sessions", []))
+        rooms = 0
+        for data in snapshot.get("rooms", []):
+            if data.get("room_id") in room_registry:
+                continue
+            room = room_registry.put(RoomState.from_snapshot(data))
+            if self._restore_room is not None:
+                await self._restore_room(room)
+            rooms += 1
+        logger.info("Restored %d rooms and %d guest sessions from snapshot (%.1f s old)", rooms, sessions, age)
+        return rooms
+
+    async def start(self):
+        if self.enabled and self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self.enabled:
+            try:
+                await self.save()
+            except Exception as exc:
+                logger.warning("Final signaling snapshot failed: %s", exc)
+            await self.store.close()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.save()
+            except Exception as exc:
+                logger.warning("Signaling snapshot failed: %s", exc)
+
+
+def create_snapshot_store():
+    # Workers must never share a snapshot: they would overwrite each other and restore rooms they never owned.
+    instance_id = snapshot_instance_id()
+    path = instance_snapshot_path(SIGNALING_SNAPSHOT_PATH, instance_id) if SIGNALING_SNAPSHOT_PATH else None
+    if SIGNALING_SNAPSHOT_BACKEND == "redis":
+        if REDIS_URL:
+            return RedisSnapshotStore(REDIS_URL, f"{REDIS_SNAPSHOT_KEY}:{instance_id}")
+        if not path:
+            logger.warning("SIGNALING_SNAPSHOT_BACKEND=redis but REDIS_URL is not set; snapshots are off")
+            return None
+        logger.warning("SIGNALING_SNAPSHOT_BACKEND=redis but REDIS_URL is not set; writing to %s", path)
+        return FileSnapshotStore(path)
+    if SIGNALING_SNAPSHOT_BACKEND == "file":
+        if not path:
+            logger.warning("SIGNALING_SNAPSHOT_BACKEND=file but SIGNALING_SNAPSHOT_PATH is not set; snapshots are off")
+            return None
+        return FileSnapshotStore(path)
+    return None
+
+
+room_snapshots = RoomSnapshotService(
+    create_snapshot_store(),
+    SIGNALING_SNAPSHOT_INTERVAL_SECONDS,
+    SIGNALING_SNAPSHOT_MAX_AGE_SECONDS,
+)
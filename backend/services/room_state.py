@@ -0,0 +1,492 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+from backend.core.config import SIGNALING_REPLAY_BUFFER_SIZE
+from backend.services.chat_history import ChatHistory
+from backend.services.guest_session import session_digest
+from backend.services.outbound import OutboundConnection
+
+# Clients announcing at least this protocol version get a single roster frame on join.
+ROSTER_PROTOCOL_VERSION = 2
+
+# Who a room broadcast is for: every client, only pre-roster clients, or only roster clients.
+AUDIENCE_ALL = "all"
+AUDIENCE_LEGACY = "legacy"
+AUDIENCE_ROSTER = "roster"
+
+# Webinar scopes narrow an audience to presenters and hosts, or to everyone else ("presenters:roster").
+SCOPE_PRESENTERS = "presenters"
+SCOPE_ATTENDEES = "attendees"
+_PRESENTERS_PREFIX = SCOPE_PRESENTERS + ":"
+# Breakout scopes narrow an audience to one group ("group/b2:all"); the main room is group "".
+MAIN_GROUP = ""
+_GROUP_PREFIX = "group/"
+
+# What the live-counts endpoint reports for a room with no signaling state.
+EMPTY_LIVE_COUNTS = {"participants": 0, "connected": 0, "waiting": 0}
+
+
+def scoped(scope: str, audience: str = AUDIENCE_ALL) -> str:
+    return f"{scope}:{audience}"
+
+
+def group_scope(group_id: str) -> str:
+    return _GROUP_PREFIX + group_id
+
+
+class ParticipantState:
+    """One signaling client, either admitted to the room or waiting for approval."""
+
+    __slots__ = (
+        "client_id",
+        "name",
+        "role",
+        "conn",
+        "session_id",
+        "audio_enabled",
+        "video_enabled",
+        "avatar_url",
+        "protocol",
+        "presenter",
+        "group",
+        "email",
+        "user_id",
+    )
+
+    def __init__(
+        self,
+        client_id: str,
+        name: str,
+        role: str,
+        conn: Optional[OutboundConnection],
+        session_id: str = "",
+        audio_enabled: bool = False,
+        video_enabled: bool = False,
+        avatar_url: Optional[str] = None,
+        protocol: int = 1,
+        presenter: bool = False,
+        group: str = MAIN_GROUP,
+        email: Optional[str] = None,
+        user_id: Optional[int] = None,
+    ):
+        self.client_id = client_id
+        self.name = name
+        self.role = role
+        self.conn = conn
+        self.session_id = session_id
+        self.audio_enabled = audio_enabled
+        self.video_enabled = video_enabled
+        self.avatar_url = avatar_url
+        self.protocol = protocol
+        # Promoted by the host; hosts always present.
+        self.presenter = presenter
+        # Breakout group; MAIN_GROUP while no breakouts are open.
+        self.group = group
+        # Account identity from the join token, for attendance; None for anonymous guests.
+        self.email = email
+        self.user_id = user_id
+
+    @property
+    def wants_roster(self) -> bool:
+        return self.protocol >= ROSTER_PROTOCOL_VERSION
+
+    @property
+    def presenting(self) -> bool:
+        return self.presenter or self.role == "host"
+
+    def receives(self, audience: str) -> bool:
+        if ":" in audience:
+            scope, audience = audience.split(":", 1)
+            if scope.startswith(_GROUP_PREFIX):
+                if scope[len(_GROUP_PREFIX):] != self.group:
+                    return False
+            elif (scope == SCOPE_PRESENTERS) != self.presenting:
+                return False
+        return audience == AUDIENCE_ALL or (audience == AUDIENCE_ROSTER) == self.wants_roster
+
+    def peer_payload(self) -> dict:
+        payload = {
+            "type": "user-joined",
+            "id": self.client_id,
+            "name": self.name,
+            "role": self.role,
+            "audioEnabled": self.audio_enabled,
+            "videoEnabled": self.video_enabled,
+            "avatar_url": self.avatar_url,
+        }
+        if self.presenter:
+            payload["presenter"] = True
+        return payload
+
+    def presence_fields(self) -> dict:
+        return {"audioEnabled": self.audio_enabled, "videoEnabled": self.video_enabled, "avatar_url": self.avatar_url}
+
+    def roster_entry(self) -> dict:
+        entry = {
+            "id": self.client_id,
+            "name": self.name,
+            "role": self.role,
+            "audioEnabled": self.audio_enabled,
+            "videoEnabled": self.video_enabled,
+            "avatar_url": self.avatar_url,
+        }
+        if self.presenter:
+            entry["presenter"] = True
+        return entry
+
+    def waiting_payload(self) -> dict:
+        return {"client_id": self.client_id, "name": self.name, "role": self.role}
+
+    def snapshot(self) -> dict:
+        return {
+            "id": self.client_id,
+            "name": self.name,
+            "role": self.role,
+            "session_digest": session_digest(self.session_id) if self.session_id else "",
+            "audio": self.audio_enabled,
+            "video": self.video_enabled,
+            "avatar_url": self.avatar_url,
+            "protocol": self.protocol,
+            "presenter": self.presenter,
+            "group": self.group,
+            "email": self.email,
+            "user_id": self.user_id,
+        }
+
+    @classmethod
+    def from_snapshot(cls, data: dict) -> "ParticipantState":
+        """A seat restored without a socket; it stays suspended until its client resumes.
+
+        The snapshot only has a digest of the session id, so the seat has no
+        session id until its client presents one (see ``RoomState.by_session``).
+        """
+        return cls(
+            data["id"],
+            data["name"],
+            data["role"],
+            None,
+            audio_enabled=bool(data.get("audio")),
+            video_enabled=bool(data.get("video")),
+            avatar_url=data.get("avatar_url"),
+            protocol=int(data.get("protocol", 1)),
+            presenter=bool(data.get("presenter")),
+            group=data.get("group", MAIN_GROUP),
+            email=data.get("email"),
+            user_id=data.get("user_id"),
+        )
+
+
+class RoomState:
+    """All signaling state for one room; every lookup and mutation is O(1)."""
+
+    __slots__ = (
+        "room_id",
+        "host_id",
+        "host_leave_mode",
+        "participants",
+        "presenters",
+        "breakouts",
+        "groups",
+        "waiting",
+        "sessions",
+        "restored_sessions",
+        "suspended",
+        "seq",
+        "replay",
+        "chat",
+        "throttled",
+    )
+
+    def __init__(self, room_id: str, replay_size: int = SIGNALING_REPLAY_BUFFER_SIZE):
+        self.room_id = room_id
+        self.host_id: Optional[str] = None
+        self.host_leave_mode = "end_all"
+        self.participants: Dict[str, ParticipantState] = {}
+        # The presenting subset of participants, so webinar broadcasts to presenters skip the attendees.
+        self.presenters: Dict[str, ParticipantState] = {}
+        # Open breakout groups: group id -> name. Empty when the room is not split.
+        self.breakouts: Dict[str, str] = {}
+        # group id (MAIN_GROUP included) -> seats, kept only while breakouts are open.
+        self.groups: Dict[str, Dict[str, ParticipantState]] = {}
+        # Dicts keep insertion order, so this is also the FIFO waiting queue.
+        self.waiting: Dict[str, ParticipantState] = {}
+        # session_id -> client_id for admitted participants, used to resume a dropped socket.
+        self.sessions: Dict[str, str] = {}
+        # session_digest -> client_id for seats restored from a snapshot whose client has not come back yet.
+        self.restored_sessions: Dict[str, str] = {}
+        # client_id -> grace timer for participants whose socket dropped.
+        self.suspended: Dict[str, asyncio.TimerHandle] = {}
+        self.seq = 0
+        # (seq, stamped frame, excluded client id, audience) for every room broadcast.
+        self.replay: Deque[Tuple[int, str, str, str]] = deque(maxlen=replay_size)
+        # Recent chat frames, kept longer than the replay buffer so late joiners can catch up.
+        self.chat = ChatHistory()
+        # message class -> inbound messages dropped by the per-connection rate limiter
+        self.throttled: Dict[str, int] = {}
+
+    def get(self, client_id: str) -> Optional[ParticipantState]:
+        return self.participants.get(client_id)
+
+    def connection(self, client_id: str) -> Optional[OutboundConnection]:
+        participant = self.participants.get(client_id)
+        return participant.conn if participant else None
+
+    def host_connection(self) -> Optional[OutboundConnection]:
+        return self.connection(self.host_id) if self.host_id else None
+
+    def add(self, participant: ParticipantState):
+        self.waiting.pop(participant.client_id, None)
+        self.participants[participant.client_id] = participant
+        self._index_session(participant)
+        self.refresh_presenter(participant)
+        self._index_group(participant)
+
+    def remove(self, client_id: str) -> Optional[ParticipantState]:
+        self.waiting.pop(client_id, None)
+        self._cancel_suspension(client_id)
+        participant = self.participants.pop(client_id, None)
+        self.presenters.pop(client_id, None)
+        if participant and self.groups:
+            self.groups[participant.group].pop(client_id, None)
+        if participant and self.sessions.get(participant.session_id) == client_id:
+            del self.sessions[participant.session_id]
+        if participant and not participant.session_id and self.restored_sessions:
+            for digest in [d for d, cid in self.restored_sessions.items() if cid == client_id]:
+                del self.restored_sessions[digest]
+        return participant
+
+    def enqueue_waiting(self, participant: ParticipantState):
+        # Re-queue at the back if the client asked again.
+        self.waiting.pop(participant.client_id, None)
+        self.waiting[participant.client_id] = participant
+
+    def remove_waiting(self, client_id: str) -> Optional[ParticipantState]:
+        return self.waiting.pop(client_id, None)
+
+    def refresh_presenter(self, participant: ParticipantState):
+        """Re-file a seat after its role or presenter flag changed."""
+        if participant.presenting:
+            self.presenters[participant.client_id] = participant
+        else:
+            self.presenters.pop(participant.client_id, None)
+
+    def open_breakouts(self, names: List[str]) -> List[str]:
+        """Add breakout groups named ``names``; returns their ids. Everyone starts in the main room."""
+        if not self.groups:
+            self.groups[MAIN_GROUP] = dict(self.participants)
+        group_ids = []
+        number = len(self.breakouts)
+        for name in names:
+            number += 1
+            while f"b{number}" in self.breakouts:
+                number += 1
+            group_id = f"b{number}"
+            self.breakouts[group_id] = name
+            self.groups[group_id] = {}
+            group_ids.append(group_id)
+        return group_ids
+
+    def move(self, participant: ParticipantState, group_id: str):
+        self.groups[participant.group].pop(participant.client_id, None)
+        participant.group = group_id
+        self.groups[group_id][participant.client_id] = participant
+
+    def close_breakouts(self):
+        for participant in self.participants.values():
+            participant.group = MAIN_GROUP
+        self.breakouts.clear()
+        self.groups.clear()
+
+    def breakouts_payload(self) -> dict:
+        return {
+            "type": "breakouts",
+            "groups": [
+                {"id": group_id, "name": self.breakouts.get(group_id, ""), "members": list(seats)}
+                for group_id, seats in self.groups.items()
+            ],
+        }
+
+    def by_session(self, session_id: str) -> Optional[ParticipantState]:
+        client_id = self.sessions.get(session_id)
+        if client_id is None and self.restored_sessions:
+            # A restored seat learns its session id back from the first client that hashes to it.
+            client_id = self.restored_sessions.pop(session_digest(session_id), None)
+            participant = self.participants.get(client_id) if client_id else None
+            if participant is not None:
+                participant.session_id = session_id
+                self._index_session(participant)
+            return participant
+        return self.participants.get(client_id) if client_id else None
+
+    def suspend(self, client_id: str, expiry: asyncio.TimerHandle):
+        """Keep a dropped participant's seat until ``expiry`` fires or it resumes."""
+        self._cancel_suspension(client_id)
+        self.participants[client_id].conn = None
+        self.suspended[client_id] = expiry
+
+    def reattach(self, participant: ParticipantState, conn: OutboundConnection):
+        self._cancel_suspension(participant.client_id)
+        participant.conn = conn
+
+    def record_event(self, text: str, exclude_id: str = "", audience: str = AUDIENCE_ALL) -> str:
+        """Stamp a control-lane broadcast frame with the next room sequence number and keep it for replay."""
+        self.seq += 1
+        # Frames are JSON objects, so the seq can be spliced in without re-encoding.
+        stamped = f'{{"seq":{self.seq},{text[1:]}' if len(text) > 2 else text
+        self.replay.append((self.seq, stamped, exclude_id, audience))
+        return stamped
+
+    def events_since(self, last_seq: int, participant: ParticipantState) -> Optional[List[str]]:
+        """Frames after ``last_seq`` meant for ``participant``; None once the buffer no longer reaches back."""
+        if last_seq >= self.seq:
+            return []
+        if not self.replay or self.replay[0][0] > last_seq + 1:
+            return None
+        return [
+            text
+            for seq, text, exclude_id, audience in self.replay
+            if seq > last_seq and exclude_id != participant.client_id and participant.receives(audience)
+        ]
+
+    def count_throttled(self, message_class: str):
+        self.throttled[message_class] = self.throttled.get(message_class, 0) + 1
+
+    def _index_session(self, participant: ParticipantState):
+        if participant.session_id:
+            self.sessions[participant.session_id] = participant.client_id
+
+    def _index_group(self, participant: ParticipantState):
+        if not self.groups:
+            participant.group = MAIN_GROUP
+            return
+        if participant.group not in self.groups:
+            participant.group = MAIN_GROUP
+        self.groups[participant.group][participant.client_id] = participant
+
+    def _cancel_suspension(self, client_id: str):
+        expiry = self.suspended.pop(client_id, None)
+        if expiry is not None:
+            expiry.cancel()
+
+    def audience_seats(self, audience: str) -> Dict[str, ParticipantState]:
+        """The seats an audience can reach; scoped broadcasts never walk seats outside their scope."""
+        if audience.startswith(_GROUP_PREFIX):
+            return self.groups.get(audience[len(_GROUP_PREFIX):audience.index(":")], {})
+        return self.presenters if audience.startswith(_PRESENTERS_PREFIX) else self.participants
+
+    def roster_payload(self, exclude_id: str = "", seats: Optional[Dict[str, ParticipantState]] = None) -> dict:
+        seats = self.participants if seats is None else seats
+        return {
+            "type": "roster",
+            "host_id": self.host_id,
+            "participants": [p.roster_entry() for cid, p in seats.items() if cid != exclude_id],
+        }
+
+    def count_payload(self) -> dict:
+        return {"type": "participant-count", "count": len(self.participants), "presenters": len(self.presenters)}
+
+    def is_empty(self) -> bool:
+        return not self.participants and not self.waiting
+
+    def live_counts(self) -> dict:
+        """Occupancy in O(1): suspended seats are held but have no socket right now."""
+        return {
+            "participants": len(self.participants),
+            "connected": len(self.participants) - len(self.suspended),
+            "waiting": len(self.waiting),
+        }
+
+    def snapshot(self) -> dict:
+        """Admitted seats and room settings; sockets, waiting clients, the replay buffer and chat are not kept."""
+        restored = {client_id: digest for digest, client_id in self.restored_sessions.items()}
+        participants = []
+        for participant in self.participants.values():
+            data = participant.snapshot()
+            if not data["session_digest"]:
+                # Still waiting for its client since the last restore: carry the digest over.
+                data["session_digest"] = restored.get(participant.client_id, "")
+            participants.append(data)
+        return {
+            "room_id": self.room_id,
+            "host_id": self.host_id,
+            "host_leave_mode": self.host_leave_mode,
+            "seq": self.seq,
+            "breakouts": self.breakouts,
+            "participants": participants,
+        }
+
+    @classmethod
+    def from_snapshot(cls, data: dict) -> "RoomState":
+        room = cls(data["room_id"])
+        room.host_id = data.get("host_id")
+        room.host_leave_mode = data.get("host_leave_mode", "end_all")
+        # Resuming clients are behind this seq, so they get a full roster instead of a replay.
+        room.seq = int(data.get("seq", 0))
+        breakouts = data.get("breakouts") or {}
+        if breakouts:
+            room.groups[MAIN_GROUP] = {}
+            for group_id, name in breakouts.items():
+                room.breakouts[group_id] = name
+                room.groups[group_id] = {}
+        for entry in data.get("participants", ()):
+            participant = ParticipantState.from_snapshot(entry)
+            room.add(participant)
+            if entry.get("session_digest"):
+                room.restored_sessions[entry["session_digest"]] = participant.client_id
+        return room
+
+
+class RoomRegistry:
+    def __init__(self):
+        self._rooms: Dict[str, RoomState] = {}
+
+    def __contains__(self, room_id: str) -> bool:
+        return room_id in self._rooms
+
+    def __len__(self) -> int:
+        return len(self._rooms)
+
+    def get(self, room_id: str) -> Optional[RoomState]:
+        return self._rooms.get(room_id)
+
+    def get_or_create(self, room_id: str) -> RoomState:
+        room = self._rooms.get(room_id)
+        if room is None:
+            room = self._rooms[room_id] = RoomState(room_id)
+        return room
+
+    def put(self, room: RoomState) -> RoomState:
+        self._rooms[room.room_id] = room
+        return room
+
+    def discard_if_empty(self, room_id: str) -> bool:
+        room = self._rooms.get(room_id)
+        if room is not None and room.is_empty():
+            del self._rooms[room_id]
+            return True
+        return False
+
+    def items(self):
+        return self._rooms.items()
+
+    def live_counts(self, room_ids: Iterable[str]) -> Dict[str, dict]:
+        """Counts for each requested room; rooms with no signaling state here read as empty."""
+        counts = {}
+        for room_id in room_ids:
+            room = self._rooms.get(room_id)
+            counts[room_id] = room.live_counts() if room is not None else dict(EMPTY_LIVE_COUNTS)
+        return counts
+
+    def throttled_totals(self) -> Dict[str, int]:
+        """Dropped inbound messages per rate-limit class, summed over the rooms open right now."""
+        totals: Dict[str, int] = {}
+        for room in self._rooms.values():
+            for message_class, count in room.throttled.items():
+                totals[message_class] = totals.get(message_class, 0) + count
+        return totals
+
+
+room_registry = RoomRegistry()
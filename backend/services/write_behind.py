@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Generic, Hashable, List, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# flush(items) writes one batch; it runs on a worker thread, so it may block on the DB.
+BatchFlush = Callable[[List[Any]], None]
+# merge(pending, newer) folds a newer row into one still waiting under the same key.
+BatchMerge = Callable[[Any, Any], Any]
+
+
+@dataclass
+class WriteBehindStats:
+    queued: int = 0
+    coalesced: int = 0
+    dropped: int = 0
+    flushes: int = 0
+    written: int = 0
+    failed: int = 0
+    last_batch: int = 0
+    max_batch: int = 0
+    last_lag_ms: float = 0.0
+    max_lag_ms: float = 0.0
+
+    def record(self, size: int, lag_ms: float):
+        self.flushes += 1
+        self.written += size
+        self.last_batch = size
+        self.max_batch = max(self.max_batch, size)
+        self.last_lag_ms = lag_ms
+        self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+
+    def as_dict(self) -> dict:
+        return {
+            "queued": self.queued,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "flushes": self.flushes,
+            "written": self.written,
+            "failed": self.failed,
+            "avg_batch": round(self.written / self.flushes, 1) if self.flushes else 0.0,
+            "last_batch": self.last_batch,
+            "max_batch": self.max_batch,
+            "last_lag_ms": round(self.last_lag_ms, 3),
+            "max_lag_ms": round(self.max_lag_ms, 3),
+        }
+
+
+class WriteBehindBatcher(Generic[T]):
+    """Collects rows in memory and writes them in bulk from one background task.
+
+    ``add`` only appends, so the signaling loop never waits on the database.
+    A batch goes out once ``batch_size`` rows are pending or the oldest has
+    waited ``interval`` seconds. The buffer holds at most ``max_pending``
+    rows; past that the oldest are dropped and counted. A batch the database
+    rejects is retried one row at a time, so only the offending rows are
+    lost. Lag is measured from when the oldest row in a batch was added
+    until its write finished.
+
+    With ``merge``, a row added under a key that is still pending is folded
+    into the waiting one instead of queued again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        flush: BatchFlush,
+        batch_size: int,
+        interval: float,
+        max_pending: int,
+        merge: Optional[BatchMerge] = None,
+    ):
+        self.name = name
+        self.flush = flush
+        self.merge = merge
+        self.batch_size = max(1, batch_size)
+        self.interval = max(0.0, interval)
+        self.max_pending = max(self.batch_size, max_pending)
+        self.stats = WriteBehindStats()
+        # [monotonic time added, key, row] lists so a merged row can be swapped in place.
+        self._buffer: Deque[List[Any]] = deque()
+        self._keyed: Dict[Hashable, List[Any]] = {}
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    def add(self, item: T, key: Optional[Hashable] = None):
+        if key is not None and self.merge is not None:
+            entry = self._keyed.get(key)
+            if entry is not None:
+                entry[2] = self.merge(entry[2], item)
+                self.stats.coalesced += 1
+                return
+        if len(self._buffer) >= self.max_pending:
+            self._forget(self._buffer.popleft())
+            self.stats.dropped += 1
+        entry = [time.monotonic(), key, item]
+        self._buffer.append(entry)
+        if key is not None and self.merge is not None:
+            self._keyed[key] = entry
+        self.stats.queued += 1
+        # Wake the worker to arm the interval on the first row, and to flush early on a full batch.
+        if len(self._buffer) == 1 or len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    async def start(self):
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Write out everything still buffered, then end the worker."""
+        if self._task is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        try:
+            await self._task
+        finally:
+            self._task = None
+
+    def as_dict(self) -> dict:
+        return {"pending": self.pending, **self.stats.as_dict()}
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            if not self._buffer:
+                if self._stopping:
+                    return
+                await self._wakeup.wait()
+                continue
+            if len(self._buffer) < self.batch_size and not self._stopping:
+                remaining = self.interval - (time.monotonic() - self._buffer[0][0])
+                if remaining > 0:
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), remaining)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+            await self._write_batch()
+
+    async def _write_batch(self):
+        count = min(self.batch_size, len(self._buffer))
+        oldest = self._buffer[0][0]
+        items = []
+        for _ in range(count):
+            entry = self._buffer.popleft()
+            self._forget(entry)
+            items.append(entry[2])
+        try:
+            await asyncio.to_thread(self.flush, items)
+        except Exception as exc:
+            if count == 1:
+                self.stats.failed += 1
+                logger.warning("%s write-behind flush of 1 row failed: %s", self.name, exc)
+                return
+            logger.warning("%s write-behind flush of %d rows failed, retrying one by one: %s", self.name, count, exc)
+            count = await self._write_each(items)
+            if not count:
+                return
+        self.stats.record(count, (time.monotonic() - oldest) * 1000)
+
+    async def _write_each(self, items: List[Any]) -> int:
+        """Write a rejected batch row by row so one bad row only loses itself; returns rows written."""
+        written = 0
+        for item in items:
+            try:
+                await asyncio.to_thread(self.flush, [item])
+            except Exception as exc:
+                self.stats.failed += 1
+                logger.warning("%s write-behind row dropped: %s", self.name, exc)
+            else:
+                written += 1
+        return written
+
+    def _forget(self, entry: List[Any]):
+        key = entry[1]
+        if key is not None and self._keyed.get(key) is entry:
+            del self._keyed[key]
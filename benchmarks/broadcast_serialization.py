@@ -0,0 +1,66 @@
+"""Throughput of encoding a signaling broadcast per recipient vs once per broadcast.
+
+    python -m benchmarks.broadcast_serialization --recipients 100 --broadcasts 2000
+"""
+
+import argparse
+import json
+import time
+
+from backend.services import outbound
+from backend.services.outbound import encode_payload
+
+PAYLOAD = {
+    "type": "chat-message",
+    "from": "3f2b8c1e-8a4d-4d1e-9a57-5b1f0f6d2c11",
+    "name": "Participant Name",
+    "text": "Can everyone see the shared screen? I am on slide 14 of the quarterly review.",
+    "timestamp": 1760611200123,
+}
+
+
+def per_recipient(recipients: int):
+    sink = []
+    for _ in range(recipients):
+        sink.append(json.dumps(PAYLOAD))
+    return sink
+
+
+def once_json(recipients: int):
+    text = json.dumps(PAYLOAD, separators=(",", ":"))
+    return [text] * recipients
+
+
+def once_fast(recipients: int):
+    text = encode_payload(PAYLOAD)
+    return [text] * recipients
+
+
+def run(fn, recipients: int, broadcasts: int) -> float:
+    started = time.perf_counter()
+    for _ in range(broadcasts):
+        fn(recipients)
+    return broadcasts / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recipients", type=int, default=100)
+    parser.add_argument("--broadcasts", type=int, default=2000)
+    args = parser.parse_args()
+
+    cases = [("per_recipient_json", per_recipient), ("once_json", once_json)]
+    if outbound.orjson is not None:
+        cases.append(("once_orjson", once_fast))
+
+    results = {"recipients": args.recipients, "broadcasts": args.broadcasts}
+    baseline = None
+    for name, fn in cases:
+        rate = run(fn, args.recipients, args.broadcasts)
+        baseline = baseline or rate
+        results[name] = {"broadcasts_per_sec": round(rate, 1), "speedup": round(rate / baseline, 2)}
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Per-participant memory of the signaling room state.
+
+Compares the consolidated ``RoomState``/``ParticipantState`` layout with the
+previous six parallel module-level dicts for the same population.
+
+    python -m benchmarks.room_state_memory --participants 10000 --room-size 100
+"""
+
+import argparse
+import json
+import os
+import tracemalloc
+
+os.environ.setdefault("SECRET_KEY", "signaling-benchmark-secret-key-0123456789")
+
+from backend.services.room_state import ParticipantState, RoomRegistry  # noqa: E402
+
+
+def _client_ids(participants: int, room_size: int):
+    for index in range(participants):
+        yield f"room-{index // room_size}", f"client-{index:08d}"
+
+
+def build_legacy(participants: int, room_size: int):
+    rooms, room_hosts, waiting_rooms = {}, {}, {}
+    participant_names, client_roles, participant_states = {}, {}, {}
+    for room_id, client_id in _client_ids(participants, room_size):
+        rooms.setdefault(room_id, {})[client_id] = None
+        waiting_rooms.setdefault(room_id, [])
+        participant_names.setdefault(room_id, {})[client_id] = "Participant"
+        client_roles.setdefault(room_id, {})[client_id] = "guest"
+        participant_states.setdefault(room_id, {})[client_id] = {
+            "audioEnabled": False,
+            "videoEnabled": False,
+            "avatar_url": None,
+        }
+        room_hosts.setdefault(room_id, client_id)
+    return rooms, room_hosts, waiting_rooms, participant_names, client_roles, participant_states
+
+
+def build_room_state(participants: int, room_size: int):
+    registry = RoomRegistry()
+    for room_id, client_id in _client_ids(participants, room_size):
+        room = registry.get_or_create(room_id)
+        room.add(ParticipantState(client_id, "Participant", "guest", None))
+        if room.host_id is None:
+            room.host_id = client_id
+    return registry
+
+
+def measure(builder, participants: int, room_size: int) -> int:
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    state = builder(participants, room_size)
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del state
+    return used
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--participants", type=int, default=10_000)
+    parser.add_argument("--room-size", type=int, default=100)
+    args = parser.parse_args()
+
+    results = {"participants": args.participants, "room_size": args.room_size}
+    for name, builder in (("legacy_dicts", build_legacy), ("room_state", build_room_state)):
+        used = measure(builder, args.participants, args.room_size)
+        results[name] = {
+            "total_bytes": used,
+            "bytes_per_participant": round(used / args.participants, 1),
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Messages per second through the signaling dispatcher, without any network I/O.
+
+Builds one room with ``--participants`` seats whose sockets discard every
+frame, then feeds ``--messages`` frames of each type straight into
+``dispatch`` and reports the rate per type and for a mixed stream.
+
+    python -m benchmarks.signaling_dispatch --participants 20 --messages 20000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+_db_dir = tempfile.mkdtemp(prefix="signaling-dispatch-")
+os.environ.setdefault("SECRET_KEY", "signaling-benchmark-secret-key-0123456789")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'bench.db')}"
+os.environ["SCHEDULER_ENABLED"] = "false"
+os.environ["SIGNALING_SNAPSHOT_BACKEND"] = "off"
+
+from backend.meetings import ws_signaling  # noqa: E402
+from backend.services.meeting_cache import MeetingSnapshot, meeting_cache  # noqa: E402
+from backend.services.room_state import ParticipantState, room_registry  # noqa: E402
+
+ROOM_ID = "dispatch-bench"
+
+MESSAGES = {
+    "update-state": {"type": "update-state", "audioEnabled": True, "videoEnabled": False},
+    "chat-message": {"type": "chat-message", "text": "benchmark message"},
+    "candidate": {"type": "candidate", "to": "p1", "candidate": {"candidate": "c"}},
+    "screen_share": {"type": "screen_share", "active": True},
+    "mute_user": {"type": "mute_user", "target_client_id": "p1"},
+}
+
+
+class _NullSocket:
+    async def send_text(self, text: str):
+        pass
+
+    async def close(self):
+        pass
+
+
+def build_room(participants: int) -> "ws_signaling.SignalingSession":
+    meeting_cache.put(
+        MeetingSnapshot(
+            id=1,
+            room_id=ROOM_ID,
+            owner_id=1,
+            waiting_room=True,
+            allow_guest=True,
+            allow_user_ai=True,
+            allow_user_captions=True,
+            allow_guest_screen_share=True,
+            allow_user_screen_share=True,
+        )
+    )
+    room = room_registry.get_or_create(ROOM_ID)
+    host_session = None
+    for index in range(participants):
+        client_id = "host" if index == 0 else f"p{index}"
+        conn = ws_signaling.open_connection(_NullSocket())
+        room.add(ParticipantState(client_id, client_id, "host" if index == 0 else "guest", conn))
+        if index == 0:
+            room.host_id = client_id
+            host_session = ws_signaling.SignalingSession(_NullSocket(), ROOM_ID, conn, "127.0.0.1")
+            host_session.client_id = client_id
+            # Measure dispatch, not throttling.
+            host_session.rate_limiter = ws_signaling.MessageRateLimiter({})
+    return host_session
+
+
+async def pump(session, frames) -> float:
+    started = time.perf_counter()
+    for index, frame in enumerate(frames):
+        # Handlers may mutate the message, so each frame is decoded like a fresh socket read.
+        await ws_signaling.dispatch(session, json.loads(frame))
+        if index % 256 == 0:
+            # Let the writer tasks drain so queues stay bounded as they would in production.
+            await asyncio.sleep(0)
+    return len(frames) / (time.perf_counter() - started)
+
+
+async def main_async(args) -> dict:
+    session = build_room(args.participants)
+    results = {
+        "participants": args.participants,
+        "messages": args.messages,
+        "handlers": len(ws_signaling.SIGNAL_HANDLERS),
+    }
+    for name, payload in MESSAGES.items():
+        frame = json.dumps(payload)
+        results[f"{name}_per_sec"] = round(await pump(session, [frame] * args.messages))
+
+    mixed = [json.dumps(payload) for payload in MESSAGES.values()] * (args.messages // len(MESSAGES))
+    results["mixed_per_sec"] = round(await pump(session, mixed))
+
+    started = time.perf_counter()
+    for _ in range(args.messages):
+        ws_signaling.SIGNAL_HANDLERS.get("update-state")
+    results["lookup_ns"] = round((time.perf_counter() - started) / args.messages * 1e9, 1)
+
+    room = room_registry.get(ROOM_ID)
+    await asyncio.gather(*(p.conn.close(flush=False) for p in room.participants.values()))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--participants", type=int, default=20)
+    parser.add_argument("--messages", type=int, default=20000)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main_async(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
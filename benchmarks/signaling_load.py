@@ -0,0 +1,294 @@
+"""Load test for the WebSocket signaling server.
+
+Starts the FastAPI app in-process with uvicorn on a throwaway SQLite database,
+opens ``--rooms`` rooms with ``--clients`` participants each (one host, the
+rest admitted from the waiting room), then drives chat, update-state, offer
+and candidate traffic. Clients speak protocol v2, so state changes come back
+as batched presence deltas and are timed from the sender's latest update. Reports relay latency percentiles per message type,
+join latency, broadcast enqueue time, CPU and memory per connection as JSON.
+
+With ``--webinar`` every room runs in webinar mode, so events about attendees
+only fan out to the host; compare the ``fanout`` section against a plain run.
+
+Clients and server share one process, so CPU and memory figures include the
+client side as well; compare runs against each other rather than in absolute.
+
+    python -m benchmarks.signaling_load --rooms 10 --clients 20 --rounds 20 --output bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import resource
+import socket
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+
+_db_dir = tempfile.mkdtemp(prefix="signaling-bench-")
+os.environ.setdefault("SECRET_KEY", "signaling-benchmark-secret-key-0123456789")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'bench.db')}"
+os.environ["SCHEDULER_ENABLED"] = "false"
+os.environ["SIGNALING_SNAPSHOT_BACKEND"] = "off"
+
+from datetime import timedelta  # noqa: E402
+
+import uvicorn  # noqa: E402
+import websockets  # noqa: E402
+
+from backend.auth.utils import create_access_token  # noqa: E402
+from backend.email.db import SessionLocal, init_db  # noqa: E402
+from backend.main import app  # noqa: E402
+from backend.meetings import ws_signaling  # noqa: E402
+from backend.models.meeting import Meeting  # noqa: E402
+from backend.models.user import User  # noqa: E402
+from backend.services.attendance import attendance_log  # noqa: E402
+from backend.services.chat_log import chat_log  # noqa: E402
+from backend.services.meeting_events import event_log  # noqa: E402
+from backend.services.outbound import lane_stats  # noqa: E402
+from backend.services.time_service import get_utc_now  # noqa: E402
+
+TIMED_TYPES = ("chat-message", "presence", "offer", "candidate")
+
+
+def seed(rooms: int, webinar: bool = False) -> str:
+    init_db()
+    db = SessionLocal()
+    try:
+        owner = User(email="bench-host@example.com", hashed_password="-", name="Bench Host")
+        db.add(owner)
+        db.flush()
+        now = get_utc_now()
+        for index in range(rooms):
+            db.add(
+                Meeting(
+                    title=f"Bench {index}",
+                    room_id=f"bench-{index}",
+                    meeting_link=f"bench-link-{index}",
+                    meeting_url=f"bench-url-{index}",
+                    owner_id=owner.id,
+                    scheduled_start=now,
+                    scheduled_end=now + timedelta(hours=1),
+                    webinar_mode=webinar,
+                )
+            )
+        db.commit()
+        return create_access_token({"sub": owner.email, "user_id": owner.id})
+    finally:
+        db.close()
+
+
+def percentile(samples, pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(samples) -> dict:
+    return {
+        "count": len(samples),
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p99_ms": round(percentile(samples, 99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 3) if samples else 0.0,
+    }
+
+
+class Client:
+    # client_id -> perf_counter of its latest update-state; presence deltas carry no timestamp.
+    state_sent_at = {}
+
+    def __init__(self, url: str, client_id: str, latencies):
+        self.url = url
+        self.client_id = client_id
+        self.latencies = latencies
+        self.ws = None
+        self.peers = []
+        self.events = defaultdict(asyncio.Event)
+        self.waiting = asyncio.Queue()
+        self._reader = None
+
+    async def connect(self):
+        self.ws = await websockets.connect(self.url, max_queue=None)
+        self._reader = asyncio.create_task(self._read())
+
+    async def send(self, payload: dict):
+        await self.ws.send(json.dumps(payload))
+
+    async def _read(self):
+        try:
+            async for raw in self.ws:
+                msg = json.loads(raw)
+                msg_type = msg.get("type")
+                sent_at = msg.get("bench_ts")
+                if sent_at is None:
+                    # SDP relays only forward sdp/candidate, so the timestamp rides inside them.
+                    for key in ("sdp", "candidate"):
+                        if isinstance(msg.get(key), dict):
+                            sent_at = msg[key].get("bench_ts", sent_at)
+                if sent_at is not None and msg_type in TIMED_TYPES:
+                    self.latencies[msg_type].append(time.perf_counter() - sent_at)
+                elif msg_type == "presence":
+                    now = time.perf_counter()
+                    for change in msg["changes"]:
+                        state_sent = self.state_sent_at.get(change["id"])
+                        if state_sent is not None:
+                            self.latencies[msg_type].append(now - state_sent)
+                if msg_type == "waiting-list-delta":
+                    for entry in msg["added"]:
+                        self.waiting.put_nowait(entry["client_id"])
+                elif msg_type == "roster":
+                    self.peers = [p["id"] for p in msg["participants"]]
+                self.events[msg_type].set()
+        except websockets.ConnectionClosed:
+            pass
+
+    async def close(self):
+        await self.ws.close()
+        await self._reader
+
+
+async def run_room(base: str, room_index: int, clients: int, token: str, latencies, join_times):
+    url = f"{base}/ws/bench-{room_index}"
+    host = Client(url, f"r{room_index}-host", latencies)
+    await host.connect()
+    await host.send({"type": "host-join", "from": host.client_id, "name": "Host", "token": token, "protocol": 2})
+    await host.events["joined"].wait()
+
+    async def admit_loop():
+        for _ in range(clients - 1):
+            target = await host.waiting.get()
+            await host.send({"type": "approve", "target_client_id": target})
+
+    admitter = asyncio.create_task(admit_loop())
+    guests = []
+    for index in range(clients - 1):
+        guest = Client(url, f"r{room_index}-g{index}", latencies)
+        await guest.connect()
+        started = time.perf_counter()
+        await guest.send({"type": "join", "from": guest.client_id, "name": f"Guest {index}", "protocol": 2})
+        await guest.events["approved"].wait()
+        join_times.append(time.perf_counter() - started)
+        guests.append(guest)
+    await admitter
+    return [host, *guests]
+
+
+async def drive_traffic(participants, rounds: int, interval: float):
+    ids = [p.client_id for p in participants]
+
+    async def client_loop(client: Client):
+        peers = [cid for cid in ids if cid != client.client_id]
+        for round_index in range(rounds):
+            now = time.perf_counter()
+            await client.send({"type": "chat-message", "text": "benchmark message", "bench_ts": now})
+            Client.state_sent_at[client.client_id] = now
+            await client.send({"type": "update-state", "audioEnabled": round_index % 2 == 0, "videoEnabled": False})
+            if peers:
+                target = random.choice(peers)
+                await client.send({"type": "offer", "to": target, "sdp": {"sdp": "v=0", "bench_ts": now}})
+                await client.send({"type": "candidate", "to": target, "candidate": {"candidate": "c", "bench_ts": now}})
+            await asyncio.sleep(interval)
+
+    await asyncio.gather(*(client_loop(client) for client in participants))
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def main_async(args) -> dict:
+    token = seed(args.rooms, args.webinar)
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", ws_max_queue=1024))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    base = f"ws://127.0.0.1:{port}"
+
+    latencies = defaultdict(list)
+    join_times = []
+    tracemalloc.start()
+    mem_before = tracemalloc.get_traced_memory()[0]
+    cpu_before = resource.getrusage(resource.RUSAGE_SELF)
+
+    started = time.perf_counter()
+    room_participants = await asyncio.gather(
+        *(run_room(base, index, args.clients, token, latencies, join_times) for index in range(args.rooms))
+    )
+    participants = [client for room in room_participants for client in room]
+    setup_seconds = time.perf_counter() - started
+    mem_connected = tracemalloc.get_traced_memory()[0]
+    # tracemalloc slows every allocation; keep it out of the timed traffic phase.
+    tracemalloc.stop()
+
+    traffic_started = time.perf_counter()
+    await asyncio.gather(*(drive_traffic(room, args.rounds, args.interval) for room in room_participants))
+    await asyncio.sleep(args.drain)
+    traffic_seconds = time.perf_counter() - traffic_started
+
+    cpu_after = resource.getrusage(resource.RUSAGE_SELF)
+
+    await asyncio.gather(*(client.close() for client in participants))
+    server.should_exit = True
+    await server_task
+
+    connections = len(participants)
+    cpu_seconds = (cpu_after.ru_utime - cpu_before.ru_utime) + (cpu_after.ru_stime - cpu_before.ru_stime)
+    return {
+        "config": {
+            "rooms": args.rooms,
+            "clients_per_room": args.clients,
+            "rounds": args.rounds,
+            "interval_s": args.interval,
+            "webinar": args.webinar,
+        },
+        "connections": connections,
+        "setup_seconds": round(setup_seconds, 3),
+        "traffic_seconds": round(traffic_seconds, 3),
+        "join": summarize(join_times),
+        "relay_latency": {msg_type: summarize(latencies[msg_type]) for msg_type in TIMED_TYPES},
+        "fanout": ws_signaling.fanout_stats.as_dict(),
+        "outbound_lanes": lane_stats.as_dict(),
+        "chat_log": chat_log.as_dict(),
+        "attendance": attendance_log.as_dict(),
+        "meeting_events": event_log.as_dict(),
+        "cpu_seconds": round(cpu_seconds, 3),
+        "cpu_ms_per_connection": round(cpu_seconds * 1000 / connections, 3) if connections else 0.0,
+        "memory_bytes_per_connection": round((mem_connected - mem_before) / connections) if connections else 0,
+        "python": sys.version.split()[0],
+    }
+
+
+def main():
+    # The app configures INFO logging on import; per-connection logs would dominate the output.
+    logging.getLogger().setLevel(logging.WARNING)
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rooms", type=int, default=5)
+    parser.add_argument("--clients", type=int, default=10, help="participants per room, including the host")
+    parser.add_argument("--rounds", type=int, default=10, help="traffic rounds per client")
+    parser.add_argument("--interval", type=float, default=0.05, help="seconds between rounds")
+    parser.add_argument("--drain", type=float, default=1.0, help="seconds to wait for in-flight frames")
+    parser.add_argument("--webinar", action="store_true", help="run every room in webinar mode")
+    parser.add_argument("--output", help="write the JSON results to this file as well")
+    args = parser.parse_args()
+
+    results = asyncio.run(main_async(args))
+    text = json.dumps(results, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
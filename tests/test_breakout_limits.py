@@ -0,0 +1,44 @@
+import asyncio
+import os
+import tempfile
+from types import SimpleNamespace
+
+_db_dir = tempfile.mkdtemp(prefix="breakout-limits-")
+os.environ.setdefault("SECRET_KEY", "breakout-limits-test-secret-key-0123456789")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_db_dir, 'test.db')}")
+os.environ.setdefault("SCHEDULER_ENABLED", "false")
+os.environ.setdefault("SIGNALING_SNAPSHOT_BACKEND", "off")
+
+from backend.meetings.ws_signaling import MAX_BREAKOUT_GROUPS, _on_breakout_open  # noqa: E402
+from backend.services.room_state import RoomState  # noqa: E402
+
+
+class _Connection:
+    def __init__(self):
+        self.sent = []
+
+    def send(self, payload: dict):
+        self.sent.append(payload)
+
+
+def _session():
+    return SimpleNamespace(client_id="host", connection=_Connection())
+
+
+def test_huge_breakout_count_is_clamped():
+    room = RoomState("breakout-limits")
+    asyncio.run(_on_breakout_open(_session(), room, None, {"type": "breakout-open", "count": 10**9}))
+    assert len(room.breakouts) == MAX_BREAKOUT_GROUPS
+
+    # Nothing is left to open, so a second huge request is refused without building any names.
+    session = _session()
+    asyncio.run(_on_breakout_open(session, room, None, {"type": "breakout-open", "count": 10**18}))
+    assert len(room.breakouts) == MAX_BREAKOUT_GROUPS
+    assert session.connection.sent[0]["type"] == "error"
+
+
+def test_breakout_group_list_is_clamped():
+    room = RoomState("breakout-limits")
+    names = [f"Room {index}" for index in range(MAX_BREAKOUT_GROUPS * 4)]
+    asyncio.run(_on_breakout_open(_session(), room, None, {"type": "breakout-open", "groups": names}))
+    assert list(room.breakouts.values()) == names[:MAX_BREAKOUT_GROUPS]
@@ -0,0 +1,85 @@
+import asyncio
+import json
+import os
+import tempfile
+from types import SimpleNamespace
+
+_db_dir = tempfile.mkdtemp(prefix="resume-replay-")
+os.environ.setdefault("SECRET_KEY", "resume-replay-test-secret-key-0123456789")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_db_dir, 'test.db')}")
+os.environ.setdefault("SCHEDULER_ENABLED", "false")
+os.environ.setdefault("SIGNALING_SNAPSHOT_BACKEND", "off")
+
+from backend.meetings.ws_signaling import _deliver_room, _on_chat_history  # noqa: E402
+from backend.services.outbound import (  # noqa: E402
+    LANE_CHAT,
+    LANE_CONTROL,
+    OutboundConnection,
+    encode_payload,
+)
+from backend.services.room_state import ParticipantState, room_registry  # noqa: E402
+
+
+class _Socket:
+    def __init__(self):
+        self.frames = []
+
+    async def send_text(self, text: str):
+        self.frames.append(json.loads(text))
+
+    async def close(self):
+        pass
+
+
+def test_chat_queued_behind_control_is_not_lost_on_resume():
+    async def scenario():
+        room = room_registry.get_or_create("resume-replay")
+        socket = _Socket()
+        conn = OutboundConnection(socket, max_size=64, policy="coalesce", send_timeout=1.0)
+        room.add(ParticipantState("a", "a", "guest", conn, session_id="sig_a"))
+        for index in range(5):
+            frame = encode_payload({"type": "chat-message", "text": f"m{index}", "from": "h"})
+            _deliver_room(room.room_id, frame, None, "h", lane=LANE_CHAT)
+        _deliver_room(room.room_id, encode_payload({"type": "user-left", "id": "b"}), None, "", lane=LANE_CONTROL)
+        await conn.close()
+        return room, socket.frames
+
+    room, frames = asyncio.run(scenario())
+    try:
+        # The control frame overtakes the queued chat, as the lanes intend.
+        assert [frame["type"] for frame in frames] == ["user-left"] + ["chat-message"] * 5
+        # Only control frames carry the room seq, so resuming from the highest one seen skips nothing.
+        last_seq = max(frame["seq"] for frame in frames if "seq" in frame)
+        assert room.events_since(last_seq, room.get("a")) == []
+        assert all("seq" not in frame for frame in frames[1:])
+        # Chat has its own cursor and is caught up through the history instead.
+        assert [frame["chat_seq"] for frame in frames[1:]] == [1, 2, 3, 4, 5]
+        history, cursor, more = room.chat.page(0, 10, room.get("a").receives)
+        assert [json.loads(text)["text"] for text in history] == [f"m{index}" for index in range(5)]
+        assert (cursor, more) == (5, False)
+    finally:
+        room_registry._rooms.pop(room.room_id, None)
+
+
+def test_chat_history_ignores_out_of_range_cursors():
+    async def scenario():
+        room = room_registry.get_or_create("history-overflow")
+        socket = _Socket()
+        conn = OutboundConnection(socket, max_size=64, policy="coalesce", send_timeout=1.0)
+        me = ParticipantState("a", "a", "guest", conn, session_id="sig_a")
+        room.add(me)
+        frame = encode_payload({"type": "chat-message", "text": "hi", "from": "h"})
+        _deliver_room(room.room_id, frame, None, "h", lane=LANE_CHAT)
+        # json.loads turns 1e999 into inf, which int() rejects with OverflowError.
+        msg = json.loads('{"since": 1e999, "limit": -1e999}')
+        await _on_chat_history(SimpleNamespace(connection=conn), room, me, msg)
+        await conn.close()
+        return room, socket.frames
+
+    room, frames = asyncio.run(scenario())
+    try:
+        history = frames[-1]
+        assert history["type"] == "chat-history"
+        assert [message["text"] for message in history["messages"]] == ["hi"]
+    finally:
+        room_registry._rooms.pop(room.room_id, None)
@@ -0,0 +1,69 @@
+import asyncio
+import os
+
+os.environ.setdefault("SECRET_KEY", "room-bus-test-secret-key-0123456789abcdef")
+
+from backend.services.outbound import LANE_CHAT, LANE_CONTROL  # noqa: E402
+from backend.services.room_bus import BrokerRoomBus, InMemoryBroker  # noqa: E402
+from backend.services.room_state import AUDIENCE_ROSTER  # noqa: E402
+
+
+class _Worker:
+    """One bus with the delivery callbacks of a worker that owns ``client_ids``."""
+
+    def __init__(self, broker: InMemoryBroker, client_ids):
+        self.client_ids = set(client_ids)
+        self.rooms = []
+        self.direct = []
+        self.bus = BrokerRoomBus(broker.connect())
+        self.bus.bind(self._deliver_room, self._deliver_direct)
+
+    def _deliver_room(self, room_id, text, coalesce_key, exclude_id, audience, lane):
+        self.rooms.append((room_id, text, coalesce_key, exclude_id, audience, lane))
+
+    def _deliver_direct(self, room_id, target_id, text, lane):
+        if target_id not in self.client_ids:
+            return False
+        self.direct.append((room_id, target_id, text, lane))
+        return True
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_broker_buses_relay_between_workers():
+    async def scenario():
+        broker = InMemoryBroker()
+        first, second = _Worker(broker, {"a"}), _Worker(broker, {"b"})
+        for worker in (first, second):
+            await worker.bus.start()
+            await worker.bus.watch("room")
+
+        await first.bus.publish_room("room", '{"type":"chat-message"}', ("chat", "a"), "a", AUDIENCE_ROSTER, LANE_CHAT)
+        await _settle()
+        expected = ("room", '{"type":"chat-message"}', ("chat", "a"), "a", AUDIENCE_ROSTER, LANE_CHAT)
+        # Delivered locally once, and once on the other worker; never echoed back to the sender's bus.
+        assert first.rooms == [expected]
+        assert second.rooms == [expected]
+
+        # A recipient on this worker is served locally without touching the broker.
+        assert await first.bus.publish_direct("room", "a", '{"type":"offer"}') is True
+        await _settle()
+        assert second.direct == []
+
+        assert await first.bus.publish_direct("room", "b", '{"type":"answer"}') is False
+        await _settle()
+        assert second.direct == [("room", "b", '{"type":"answer"}', LANE_CONTROL)]
+
+        # Once unwatched, the room's frames no longer reach that worker.
+        await second.bus.unwatch("room")
+        await first.bus.publish_room("room", '{"type":"user-left"}')
+        await _settle()
+        assert len(second.rooms) == 1
+
+        for worker in (first, second):
+            await worker.bus.stop()
+
+    asyncio.run(scenario())
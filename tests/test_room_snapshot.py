@@ -0,0 +1,46 @@
+import json
+import os
+import stat
+import tempfile
+
+os.environ.setdefault("SECRET_KEY", "room-snapshot-test-secret-key-0123456789ab")
+
+from backend.services.guest_session import guest_session_manager, session_digest  # noqa: E402
+from backend.services.room_snapshot import FileSnapshotStore  # noqa: E402
+from backend.services.room_state import ParticipantState, RoomState  # noqa: E402
+
+
+def test_room_snapshot_keeps_only_session_digests():
+    room = RoomState("snapshot-room")
+    room.add(ParticipantState("a", "A", "host", None, session_id="sig_secret"))
+    data = room.snapshot()
+    assert "sig_secret" not in json.dumps(data)
+
+    restored = RoomState.from_snapshot(json.loads(json.dumps(data)))
+    # The digest itself is not a credential.
+    assert restored.by_session(session_digest("sig_secret")) is None
+    # Saved again before the client came back, the seat still carries its digest.
+    assert restored.snapshot()["participants"][0]["session_digest"] == session_digest("sig_secret")
+
+    seat = restored.by_session("sig_secret")
+    assert seat is not None and seat.client_id == "a" and seat.session_id == "sig_secret"
+    assert restored.by_session("sig_secret") is seat
+
+
+def test_guest_sessions_are_exported_as_digests():
+    session_id, _ = guest_session_manager.create_guest_session("snapshot-guests", "G", is_host=True)
+    exported = [entry for entry in guest_session_manager.export_sessions() if entry["room_id"] == "snapshot-guests"]
+    assert session_id not in json.dumps(exported)
+
+    guest_session_manager._cleanup_session(session_id)
+    assert guest_session_manager.restore_sessions(exported) == 1
+    assert guest_session_manager.get_session(session_digest(session_id)) is None
+    session = guest_session_manager.get_session(session_id)
+    assert session is not None and session.is_host and session.session_id == session_id
+    guest_session_manager._cleanup_session(session_id)
+
+
+def test_file_snapshot_is_owner_only():
+    path = os.path.join(tempfile.mkdtemp(prefix="room-snapshot-"), "snapshot.json")
+    FileSnapshotStore(path)._write("{}")
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
@@ -0,0 +1,54 @@
+import os
+import tempfile
+from types import SimpleNamespace
+
+_db_dir = tempfile.mkdtemp(prefix="signaling-rate-")
+os.environ.setdefault("SECRET_KEY", "signaling-rate-test-secret-key-0123456789")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_db_dir, 'test.db')}")
+os.environ.setdefault("SCHEDULER_ENABLED", "false")
+os.environ.setdefault("SIGNALING_SNAPSHOT_BACKEND", "off")
+
+from backend.core.rate_limit import MessageRateLimiter  # noqa: E402
+from backend.meetings.ws_signaling import (  # noqa: E402
+    MESSAGE_RATE_LIMITS,
+    SIGNAL_HANDLERS,
+    _within_rate_limit,
+)
+from backend.services.room_state import ParticipantState, RoomState  # noqa: E402
+
+
+def _room(size: int) -> RoomState:
+    room = RoomState("rate-room")
+    room.add(ParticipantState("host", "Host", "host", None))
+    for index in range(size - 1):
+        room.add(ParticipantState(f"p{index}", f"P{index}", "guest", None))
+    return room
+
+
+def _session(client_id: str):
+    return SimpleNamespace(client_id=client_id, rate_limiter=MessageRateLimiter(MESSAGE_RATE_LIMITS))
+
+
+def test_joiner_can_negotiate_with_a_full_room():
+    room = _room(100)
+    joiner = _session("p0")
+    handler = SIGNAL_HANDLERS["candidate"]
+    # An offer and eight ICE candidates to each of the 99 peers.
+    assert all(_within_rate_limit(joiner, room, handler, "rtc") for _ in range(99 * 9))
+
+
+def test_rtc_is_still_limited_in_a_small_room():
+    room = _room(2)
+    sender = _session("p0")
+    handler = SIGNAL_HANDLERS["candidate"]
+    results = [_within_rate_limit(sender, room, handler, "rtc") for _ in range(1000)]
+    assert not all(results)
+
+
+def test_host_moderation_skips_the_control_bucket():
+    room = _room(100)
+    host, guest = _session("host"), _session("p0")
+    kick = SIGNAL_HANDLERS["kick_user"]
+    assert kick.host_only
+    assert all(_within_rate_limit(host, room, kick, "control") for _ in range(200))
+    assert not all(_within_rate_limit(guest, room, kick, "control") for _ in range(200))
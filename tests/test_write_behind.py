@@ -0,0 +1,25 @@
+import asyncio
+
+from backend.services.write_behind import WriteBehindBatcher
+
+
+def test_rejected_batch_falls_back_to_single_rows():
+    written = []
+
+    def flush(rows):
+        if any(row == "bad" for row in rows):
+            raise ValueError("value too long for column")
+        written.extend(rows)
+
+    async def scenario():
+        batcher = WriteBehindBatcher("test", flush, batch_size=10, interval=60, max_pending=100)
+        await batcher.start()
+        for row in ("alice", "bad", "bob"):
+            batcher.add(row)
+        await batcher.stop()
+        return batcher
+
+    batcher = asyncio.run(scenario())
+    assert written == ["alice", "bob"]
+    stats = batcher.stats.as_dict()
+    assert (stats["written"], stats["failed"], stats["flushes"]) == (2, 1, 1)